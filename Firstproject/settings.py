@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings include the rest of the stack
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -128,6 +131,59 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Timetable generator
+# Number of TimetableEntry rows written per INSERT when persisting a generated timetable
+TIMETABLE_BULK_BATCH_SIZE = 500
+# Background generation jobs run concurrently on this many threads
+TIMETABLE_JOB_WORKERS = 2
+# Solves allowed to run at once per process; identical concurrent requests share one solve
+TIMETABLE_MAX_CONCURRENT_GENERATIONS = 2
+# Seeded solves kept for reuse (least recently used first out; 0 disables), and their total lectures
+TIMETABLE_SOLVE_CACHE_SIZE = 50
+TIMETABLE_SOLVE_CACHE_ROWS = 500000
+# Generation retries from a fresh snapshot this many times if its inputs change mid-solve
+TIMETABLE_GENERATION_ATTEMPTS = 3
+# Seconds a cached API read is kept; any data change invalidates it sooner
+TIMETABLE_READ_CACHE_TIMEOUT = 600
+# Recent requests per route kept for the latency percentiles at /api/metrics/
+METRICS_SAMPLE_SIZE = 1000
+
+# Logging: the api app logs writes and generation runs at INFO.
+# Set SCHEDULIX_LOG_LEVEL=DEBUG or WARNING to change how much is shown.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.environ.get('SCHEDULIX_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Cache for API read bodies. They are keyed by the data version, which is kept
+# in the database, so a per-process cache is safe; a shared backend (Memcached,
+# Redis) lets server processes reuse each other's responses.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'schedulix',
+    }
+}
+
 # CSRF trusted origins (add your frontend host here)
 CSRF_TRUSTED_ORIGINS = []
 
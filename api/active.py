@@ -0,0 +1,32 @@
+"""
+The active timetable pointer.
+
+At most one timetable is active: a partial unique index on
+Timetable.is_active (where it is true) enforces it, and Timetable.save()
+deactivates the previous one in the same transaction, so a committed state
+never has zero-then-two active rows mid-swap.
+
+active_timetable() is the app's most frequent query. It reads through to
+the database every time: the same partial index answers it, and a copy kept
+in process memory would go stale when another worker process activates a
+timetable, while checking it against the shared data version would cost
+the same single-row read.
+"""
+from .models import Timetable
+
+
+def active_timetable():
+    """(id, name) of the active timetable, or None"""
+    return Timetable.objects.filter(is_active=True).values_list('id', 'name').first()
+
+
+def active_timetable_id():
+    active = active_timetable()
+    return active[0] if active else None
+
+
+def activate_timetable(timetable):
+    """Make timetable the only active one; the swap is one transaction (see Timetable.save)"""
+    timetable.is_active = True
+    timetable.save(update_fields=['is_active'])
+    return timetable
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry
+from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry, GenerationJob
 
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
@@ -30,4 +30,9 @@ class TimetableAdmin(admin.ModelAdmin):
 @admin.register(TimetableEntry)
 class TimetableEntryAdmin(admin.ModelAdmin):
     list_display = ['timetable', 'day', 'time_slot', 'subject', 'teacher', 'classroom']
-    list_filter = ['timetable', 'day', 'is_break']
\ No newline at end of file
+    list_filter = ['timetable', 'day', 'is_break']
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'processed_slots', 'total_slots', 'created_at', 'finished_at']
+    list_filter = ['status']
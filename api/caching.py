@@ -0,0 +1,99 @@
+"""
+Versioned read cache for the API.
+
+Every change to the scheduling data bumps a data-version counter: model
+save/delete signals do it for ordinary writes, bulk writers (generator,
+repair, importer) call mark_data_changed() themselves. Read responses are
+cached under the current version, so a bump invalidates all of them at once
+without tracking which ones changed.
+
+Responses carry an ETag built from the version and the request path. When a
+client's If-None-Match still matches, the view answers 304 after reading
+only the version; reads authenticate lazily so not even the session is loaded.
+
+The counter is a DataCounter row, so every server process, management
+command and job sees each bump. Only the cached bodies live in Django's
+cache; they are keyed by version, so a per-process cache stays correct.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .models import DataCounter
+
+DATA_VERSION_KEY = 'data_version'
+READ_CACHE_KEY = 'schedulix:read:{version}:{path}'
+
+
+def data_version():
+    """Current data version, starting one if there is none"""
+    version = DataCounter.objects.filter(key=DATA_VERSION_KEY).values_list('value', flat=True).first()
+    if version is None:
+        # Start from the clock so a recreated counter never reuses a version still in some cache
+        counter, _ = DataCounter.objects.get_or_create(key=DATA_VERSION_KEY, defaults={'value': time.time_ns() // 1000})
+        version = counter.value
+    return version
+
+
+def bump_data_version():
+    if not DataCounter.objects.filter(key=DATA_VERSION_KEY).update(value=F('value') + 1):
+        data_version()
+
+
+def mark_data_changed(**kwargs):
+    """Bump the data version once the current transaction commits; usable as a signal receiver"""
+    transaction.on_commit(bump_data_version)
+
+
+def cached_response(request, compute):
+    """
+    Serve a GET from the versioned cache.
+
+    compute() builds the Response on a miss; only 200 responses are cached.
+    A matching If-None-Match gets 304 without calling compute().
+    """
+    version = data_version()
+    path = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:16]
+    etag = f'"{version}-{path}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+    key = READ_CACHE_KEY.format(version=version, path=path)
+    data = cache.get(key)
+    if data is None:
+        response = compute()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        data = response.data
+        cache.set(key, data, getattr(settings, 'TIMETABLE_READ_CACHE_TIMEOUT', 600))
+    return with_etag(Response(data), etag)
+
+
+def with_etag(response, etag):
+    response['ETag'] = etag
+    # Let browsers keep the body but revalidate it on every use
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+class CachedReadMixin:
+    """ViewSet mixin that serves list and retrieve through cached_response"""
+
+    def perform_authentication(self, request):
+        """Authenticate lazily on reads so a 304 costs no session or user query"""
+        if request.method not in SAFE_METHODS:
+            super().perform_authentication(request)
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, lambda: super(CachedReadMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs))
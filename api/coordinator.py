@@ -0,0 +1,118 @@
+"""
+Single-flight coordination of timetable generation.
+
+Requests are fingerprinted by the input version they would solve against
+plus the options that affect the result. While a solve for a fingerprint is
+in flight, identical requests wait for it and get the same timetable back
+instead of solving again. Solves themselves are capped by a semaphore
+(TIMETABLE_MAX_CONCURRENT_GENERATIONS), shared by API requests, form posts
+and background jobs.
+
+Coordination is per server process: the in-flight table and the semaphore
+live in memory, like the job thread pool in api.jobs. Callers that can be
+cancelled pass check_cancelled, which is polled while they wait for a slot
+or for another request's solve.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from .solvers import GenerationCancelled
+from .statistics import input_version
+from .timetable_generator import TimetableGenerator
+
+# Options that change how a solve runs but not the timetable it produces
+EXECUTION_OPTIONS = ('batch_size', 'workers')
+# Seconds between cancellation checks while waiting
+CANCEL_POLL_INTERVAL = 1.0
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator():
+    """Process-wide GenerationCoordinator"""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = GenerationCoordinator(getattr(settings, 'TIMETABLE_MAX_CONCURRENT_GENERATIONS', 2))
+        return _coordinator
+
+
+class Flight:
+    """One in-flight solve and the result its waiters will share"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.timetable = None
+        self.stats = None
+        self.error = None
+
+
+class GenerationCoordinator:
+    """Collapse identical concurrent generation requests and cap concurrent solves"""
+
+    def __init__(self, max_concurrent=2):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+
+    def fingerprint(self, options):
+        params = {key: value for key, value in options.items() if key not in EXECUTION_OPTIONS}
+        return input_version(), json.dumps(params, sort_keys=True, default=str)
+
+    def generate(self, name, options, progress=None, check_cancelled=None):
+        """
+        Generate a timetable, or wait for an identical solve already running.
+        Returns (timetable, stats); stats has shared=True for waiters.
+        check_cancelled() may raise GenerationCancelled to stop waiting.
+        """
+        while True:
+            key = self.fingerprint(options)
+            with self.lock:
+                flight = self.flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.flights[key] = Flight()
+            if leader:
+                return self.lead(key, flight, name, options, progress, check_cancelled)
+
+            self.wait(flight.done.wait, check_cancelled)
+            if isinstance(flight.error, GenerationCancelled):
+                # The leading job was cancelled, not this request; solve it ourselves
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.timetable, dict(flight.stats, shared=True)
+
+    def lead(self, key, flight, name, options, progress, check_cancelled):
+        try:
+            started = time.perf_counter()
+            self.wait(self.slots.acquire, check_cancelled)
+            try:
+                queue_time = round(time.perf_counter() - started, 4)
+                generator = TimetableGenerator(progress=progress, **options)
+                flight.timetable = generator.generate_timetable(name)
+                flight.stats = dict(generator.stats, queue_time=queue_time)
+            finally:
+                self.slots.release()
+            return flight.timetable, dict(flight.stats, shared=False)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    @staticmethod
+    def wait(acquire, check_cancelled):
+        """Block on acquire(timeout=...), checking for cancellation before and while waiting"""
+        if check_cancelled is None:
+            acquire(timeout=None)
+            return
+        check_cancelled()
+        while not acquire(timeout=CANCEL_POLL_INTERVAL):
+            check_cancelled()
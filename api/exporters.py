@@ -0,0 +1,199 @@
+"""
+Streaming timetable and database exports.
+
+Rows are read with values()/values_list() through queryset.iterator(), so
+neither model instances nor the whole file are ever held in memory, and the
+web process stays flat however large the export is.
+"""
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.http import StreamingHttpResponse
+
+from .models import Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable, TimetableEntry
+from .problem import DAYS
+
+EXPORT_CHUNK_SIZE = 2000
+# Bytes collected before a chunk is handed to the response
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Full-database export order; parents come before the rows that reference them
+DATA_TABLES = [
+    ('subjects', Subject),
+    ('teachers', Teacher),
+    ('teacher_subjects', TeacherSubject),
+    ('classrooms', Classroom),
+    ('time_slots', TimeSlot),
+    ('timetables', Timetable),
+    ('timetable_entries', TimetableEntry),
+]
+
+# (CSV header, values_list lookup)
+EXPORT_COLUMNS = [
+    ('Timetable', 'timetable__name'),
+    ('Day', 'day'),
+    ('Start Time', 'time_slot__start_time'),
+    ('End Time', 'time_slot__end_time'),
+    ('Subject', 'subject__name'),
+    ('Teacher', 'teacher__name'),
+    ('Classroom', 'classroom__number'),
+    ('Type', 'is_break'),
+]
+
+
+def export_queryset(timetable_ids, teacher_ids=None, classroom_ids=None):
+    """
+    Entries of the given timetables in timetable, weekday and time order.
+
+    Teacher and classroom filters slice the export to those lectures; break
+    rows are kept so each slice still shows the day's structure.
+    """
+    queryset = TimetableEntry.objects.filter(timetable_id__in=timetable_ids)
+    if teacher_ids:
+        queryset = queryset.filter(Q(teacher_id__in=teacher_ids) | Q(is_break=True))
+    if classroom_ids:
+        queryset = queryset.filter(Q(classroom_id__in=classroom_ids) | Q(is_break=True))
+    day_order = Case(
+        *[When(day=day, then=Value(i)) for i, day in enumerate(DAYS)],
+        default=Value(len(DAYS)),
+        output_field=IntegerField()
+    )
+    return queryset.order_by('timetable_id', day_order, 'time_slot__start_time', 'classroom__number')
+
+
+def export_rows(queryset, columns):
+    """Yield one tuple per entry with break rows' empty relations as blanks"""
+    lookups = [lookup for _, lookup in columns]
+    type_index = lookups.index('is_break')
+    for row in queryset.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = ['' if value is None else value for value in row]
+        row[type_index] = 'Break' if row[type_index] else 'Class'
+        yield row
+
+
+class Echo:
+    """File-like object whose write() returns the line for the streaming generator"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(queryset, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+    for row in export_rows(queryset, columns):
+        yield writer.writerow(row)
+
+
+def csv_response(queryset, filename, include_timetable=False):
+    """StreamingHttpResponse with the queryset as CSV"""
+    columns = EXPORT_COLUMNS if include_timetable else EXPORT_COLUMNS[1:]
+    response = StreamingHttpResponse(csv_lines(queryset, columns), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def table_rows(model):
+    """Every row of a table as a dict, in primary key order"""
+    return model.objects.order_by('pk').values().iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def ndjson_lines():
+    """One {"model": ..., "data": {...}} record per line for every exported row"""
+    encoder = DjangoJSONEncoder()
+    for name, model in DATA_TABLES:
+        for row in table_rows(model):
+            yield encoder.encode({'model': name, 'data': row}) + '\n'
+
+
+def json_document():
+    """The {"subjects": [...], "teachers": [...], ...} document, written one row at a time"""
+    encoder = DjangoJSONEncoder()
+    yield '{'
+    for i, (name, model) in enumerate(DATA_TABLES):
+        yield ('' if i == 0 else ',') + f'\n"{name}": ['
+        for j, row in enumerate(table_rows(model)):
+            yield ('' if j == 0 else ',') + '\n' + encoder.encode(row)
+        yield '\n]'
+    yield '\n}\n'
+
+
+def keyset_batches(queryset, size=EXPORT_CHUNK_SIZE):
+    """Yield lists of objects in primary key order; each batch is one index range query from the last id"""
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        batch = list((queryset if last is None else queryset.filter(pk__gt=last))[:size])
+        if batch:
+            yield batch
+        if len(batch) < size:
+            return
+        last = batch[-1].pk
+
+
+def json_stream_response(batches, serialize, ndjson=False):
+    """
+    Stream serialize(batch) for every batch as one JSON array, or as NDJSON.
+
+    serialize turns a batch of objects into a list of dicts, e.g. a
+    serializer's data, so only one batch is ever in memory.
+    """
+    encoder = DjangoJSONEncoder()
+
+    def pieces():
+        first = True
+        if not ndjson:
+            yield '['
+        for batch in batches:
+            for row in serialize(batch):
+                if ndjson:
+                    yield encoder.encode(row) + '\n'
+                else:
+                    yield ('' if first else ',') + '\n' + encoder.encode(row)
+                    first = False
+        if not ndjson:
+            yield '\n]\n'
+
+    return StreamingHttpResponse(
+        buffered(pieces()), content_type='application/x-ndjson' if ndjson else 'application/json'
+    )
+
+
+def buffered(pieces, size=STREAM_BUFFER_SIZE):
+    """Join small string pieces into encoded chunks of about size bytes"""
+    buffer, length = [], 0
+    for piece in pieces:
+        data = piece.encode()
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    """Gzip a byte stream on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def data_export_response(ndjson=False, compress=False):
+    """Streaming full-database export as a JSON document or NDJSON, optionally gzipped"""
+    if ndjson:
+        chunks, content_type, filename = buffered(ndjson_lines()), 'application/x-ndjson', 'timetable_data.ndjson'
+    else:
+        chunks, content_type, filename = buffered(json_document()), 'application/json', 'timetable_data.json'
+    if compress:
+        chunks, content_type, filename = gzipped(chunks), 'application/gzip', filename + '.gz'
+    
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
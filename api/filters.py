@@ -0,0 +1,78 @@
+"""
+Query-string filters for timetable entries.
+
+"My week" and "what is in this room today" are answered from the composite
+indexes on TimetableEntry: (teacher, timetable, day, time_slot) and
+(classroom, timetable, day, time_slot), plus the (timetable, day, time_slot)
+prefix of its unique constraints for whole-day views. Every filter becomes
+an equality or IN on one of those columns. The active timetable and a time
+range are resolved to ids first, so the entry lookup never joins.
+"""
+from django.utils.dateparse import parse_time
+
+from .active import active_timetable_id
+from .models import TimeSlot
+from .problem import DAYS
+
+
+def id_param(params, name):
+    """Comma-separated ids, e.g. ?teacher=1,2; None when absent"""
+    value = params.get(name, '')
+    if not value.strip():
+        return None
+    try:
+        return [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError(f'"{name}" must be a comma-separated list of ids')
+
+
+def time_param(params, name):
+    value = params.get(name, '')
+    if not value.strip():
+        return None
+    try:
+        parsed = parse_time(value.strip())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'"{name}" must be a time such as 09:00')
+    return parsed
+
+
+def entry_filters(params):
+    """
+    Filter kwargs for TimetableEntry from query parameters; raises ValueError.
+
+    timetable: ids or "active"; teacher, classroom: ids; day: day names;
+    from/to: only entries whose time slot lies within that time range.
+    """
+    filters = {}
+    if params.get('timetable', '').strip().lower() == 'active':
+        active_id = active_timetable_id()
+        filters['timetable_id__in'] = [active_id] if active_id else []
+    else:
+        timetables = id_param(params, 'timetable')
+        if timetables is not None:
+            filters['timetable_id__in'] = timetables
+
+    for name in ('teacher', 'classroom'):
+        ids = id_param(params, name)
+        if ids is not None:
+            filters[f'{name}_id__in'] = ids
+
+    if params.get('day', '').strip():
+        days = [part.strip().capitalize() for part in params['day'].split(',') if part.strip()]
+        unknown = [day for day in days if day not in DAYS]
+        if unknown:
+            raise ValueError(f'Unknown day(s): {", ".join(unknown)}')
+        filters['day__in'] = days
+
+    start, end = time_param(params, 'from'), time_param(params, 'to')
+    if start is not None or end is not None:
+        slots = TimeSlot.objects.all()
+        if start is not None:
+            slots = slots.filter(start_time__gte=start)
+        if end is not None:
+            slots = slots.filter(end_time__lte=end)
+        filters['time_slot_id__in'] = list(slots.values_list('id', flat=True))
+    return filters
@@ -0,0 +1,253 @@
+"""
+Bulk importer for the data produced by export_data_json.
+
+Rows are upserted in batches with bulk_create(update_conflicts=True) on each
+model's natural key (subject code, teacher email, classroom number, time slot
+day and times). Foreign keys in the source refer to the source database's
+ids. They are resolved through in-memory maps from source id to natural key
+to local id, so a whole table costs one query per batch plus one lookup.
+
+Both the JSON document ({"subjects": [...], ...}) and the NDJSON stream
+({"model": ..., "data": {...}} per line) are accepted. NDJSON is consumed
+line by line and flushed in batches, parents before children, so large
+imports never hold the whole file in memory.
+"""
+import gzip
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.dateparse import parse_time
+
+from .caching import mark_data_changed
+from .models import Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable, TimetableEntry
+from .statistics import INPUT_VERSION_KEY, adjust_counters, rebuild_counters
+
+IMPORT_BATCH_SIZE = 1000
+
+# Table name, model and the natural key used for upserts (None: always inserted)
+IMPORT_TABLES = [
+    ('subjects', Subject, ['code']),
+    ('teachers', Teacher, ['email']),
+    ('teacher_subjects', TeacherSubject, ['teacher', 'subject']),
+    ('classrooms', Classroom, ['number']),
+    ('time_slots', TimeSlot, ['day', 'start_time', 'end_time']),
+    ('timetables', Timetable, None),
+    ('timetable_entries', TimetableEntry, None),
+]
+TABLE_ORDER = {name: i for i, (name, _, _) in enumerate(IMPORT_TABLES)}
+
+# Foreign key column -> table whose source ids it refers to
+FOREIGN_KEYS = {
+    'teacher_id': 'teachers',
+    'subject_id': 'subjects',
+    'classroom_id': 'classrooms',
+    'time_slot_id': 'time_slots',
+    'timetable_id': 'timetables',
+}
+
+
+def writable_fields(model):
+    """Concrete columns an import may set; ids and timestamps are the database's"""
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if not field.primary_key and not getattr(field, 'auto_now_add', False)
+    ]
+
+
+def natural_key(table, row):
+    """Natural key of a source row, with times parsed so they match database values"""
+    if table == 'time_slots':
+        return (row['day'], as_time(row['start_time']), as_time(row['end_time']))
+    if table == 'subjects':
+        return row['code']
+    if table == 'teachers':
+        return row['email']
+    if table == 'classrooms':
+        return row['number']
+    raise ValueError(f"Table '{table}' has no natural key")
+
+
+def as_time(value):
+    """Parse a time from the source; raises ValueError unless it is a valid time"""
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = parse_time(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'"{value}" is not a valid time')
+    return parsed
+
+
+class DataImporter:
+    """Upsert exported rows table by table; feed rows with add(), then call finish()"""
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = {name: [] for name in TABLE_ORDER}
+        # Source id -> local id, per table
+        self.ids = {name: {} for name in TABLE_ORDER}
+        self.counts = {name: 0 for name in TABLE_ORDER}
+
+    def add(self, table, row):
+        if table not in TABLE_ORDER:
+            raise ValueError(f"Unknown table '{table}'")
+        if not isinstance(row, dict):
+            raise ValueError(f"Rows of '{table}' must be objects")
+        # Parents are flushed first so their ids can be resolved
+        for name, _, _ in IMPORT_TABLES[:TABLE_ORDER[table]]:
+            if self.pending[name]:
+                self.flush(name)
+        self.pending[table].append(row)
+        if len(self.pending[table]) >= self.batch_size:
+            self.flush(table)
+
+    def finish(self):
+        for name, _, _ in IMPORT_TABLES:
+            if self.pending[name]:
+                self.flush(name)
+        return self.counts
+
+    def flush(self, table):
+        rows, self.pending[table] = self.pending[table], []
+        flush = {
+            'teacher_subjects': self.flush_links,
+            'timetables': self.flush_timetables,
+            'timetable_entries': self.flush_entries,
+        }.get(table, self.flush_upsert)
+        try:
+            flush(table, rows)
+        except KeyError as e:
+            raise ValueError(f"Rows of '{table}' need a '{e.args[0]}' field")
+        except ValidationError as e:
+            # A column value the model field cannot convert
+            raise ValueError(f"Invalid value in '{table}': {' '.join(e.messages)}")
+        self.counts[table] += len(rows)
+
+    def resolve(self, table, source_id):
+        try:
+            return self.ids[table][source_id]
+        except KeyError:
+            raise ValueError(f"Reference to unknown {table} id {source_id}")
+
+    def flush_upsert(self, table, rows):
+        """Upsert rows on their natural key and record source id -> local id"""
+        _, model, unique_fields = IMPORT_TABLES[TABLE_ORDER[table]]
+        fields = writable_fields(model)
+        objects = [model(**{field: row[field] for field in fields if field in row}) for row in rows]
+        model.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=[field for field in fields if field not in unique_fields]
+        )
+
+        # Read back local ids by natural key; bulk_create does not return them on every backend
+        keys = {natural_key(table, row) for row in rows}
+        if table == 'time_slots':
+            days = {key[0] for key in keys}
+            local = {
+                (day, start, end): pk
+                for pk, day, start, end in model.objects.filter(day__in=days).values_list(
+                    'id', 'day', 'start_time', 'end_time'
+                )
+            }
+        else:
+            key_field = unique_fields[0]
+            local = dict(model.objects.filter(**{f'{key_field}__in': keys}).values_list(key_field, 'id'))
+        for row in rows:
+            if 'id' in row:
+                self.ids[table][row['id']] = local[natural_key(table, row)]
+
+        # Teachers may list their subjects by source id
+        if table == 'teachers':
+            links = [
+                {'teacher_id': row['id'], 'subject_id': subject_id}
+                for row in rows if 'id' in row for subject_id in row.get('subjects', [])
+            ]
+            if links:
+                self.flush_links('teacher_subjects', links)
+
+    def flush_links(self, table, rows):
+        TeacherSubject.objects.bulk_create([
+            TeacherSubject(
+                teacher_id=self.resolve('teachers', row['teacher_id']),
+                subject_id=self.resolve('subjects', row['subject_id'])
+            )
+            for row in rows
+        ], ignore_conflicts=True)
+
+    def flush_timetables(self, table, rows):
+        """Timetables have no natural key; each import adds them as new timetables"""
+        # Inserted inactive, so the one_active_timetable constraint holds; relies on
+        # bulk_create setting primary keys (PostgreSQL, MariaDB, SQLite 3.35+)
+        timetables = Timetable.objects.bulk_create(
+            [Timetable(name=row['name'], is_active=False) for row in rows], batch_size=self.batch_size
+        )
+        for row, timetable in zip(rows, timetables):
+            if 'id' in row:
+                self.ids['timetables'][row['id']] = timetable.id
+
+        # The last active row wins; saving it deactivates the previous one
+        active = [timetable for row, timetable in zip(rows, timetables) if row.get('is_active')]
+        if active:
+            active[-1].is_active = True
+            active[-1].save(update_fields=['is_active'])
+
+    def flush_entries(self, table, rows):
+        fields = writable_fields(TimetableEntry)
+        objects = []
+        for row in rows:
+            values = {field: row[field] for field in fields if field in row}
+            for column, target in FOREIGN_KEYS.items():
+                if values.get(column) is not None:
+                    values[column] = self.resolve(target, values[column])
+            objects.append(TimetableEntry(**values))
+        TimetableEntry.objects.bulk_create(objects, batch_size=self.batch_size)
+
+
+def ndjson_records(stream):
+    """Yield (table, row) from an NDJSON byte stream"""
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            yield record['model'], record['data']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Line {number} is not a {{\"model\": ..., \"data\": ...}} record")
+
+
+def document_records(document):
+    """Yield (table, row) from the {"table": [rows]} JSON document, parents first"""
+    if not isinstance(document, dict):
+        raise ValueError("Expected a JSON object keyed by table name")
+    unknown = set(document) - set(TABLE_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+    for name, _, _ in IMPORT_TABLES:
+        for row in document.get(name, []):
+            yield name, row
+
+
+def import_data(stream, ndjson=False, compressed=False):
+    """Import an export stream in one transaction; returns rows per table and timing"""
+    started = time.perf_counter()
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream)
+    records = ndjson_records(stream) if ndjson else document_records(json.load(stream))
+
+    importer = DataImporter()
+    with transaction.atomic():
+        for table, row in records:
+            importer.add(table, row)
+        counts = importer.finish()
+        # Upserts do not tell inserts from updates, so recount
+        rebuild_counters()
+        adjust_counters({INPUT_VERSION_KEY: 1})
+        mark_data_changed()
+    return {'imported': counts, 'import_time': round(time.perf_counter() - started, 4)}
@@ -0,0 +1,171 @@
+"""
+Background timetable generation jobs.
+
+Generation requests are recorded as GenerationJob rows and executed on a
+local thread pool, so the HTTP request returns immediately with a job id.
+The running solve reports progress into the job row (throttled) and checks
+the row's cancel flag, which lets any web process report status or cancel a
+job without an external broker. The flag is also checked while the job is
+queued for a solve slot in the coordinator.
+
+Each job records the process whose pool runs it. A job whose process has
+exited (a restart or crash) can never finish, so it is marked failed the
+next time jobs are read.
+"""
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .coordinator import get_coordinator
+from .models import GenerationJob
+from .solvers import GenerationCancelled
+
+# Options accepted from the client and forwarded to TimetableGenerator
+GENERATOR_OPTIONS = ('engine', 'batch_size', 'seed', 'seeds', 'workers')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool that runs generation jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TIMETABLE_JOB_WORKERS', 2),
+                thread_name_prefix='timetable-job'
+            )
+        return _executor
+
+
+def worker_id():
+    """host:pid of this process, recorded on the jobs it runs"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def process_alive(pid):
+    """True if a process with this pid is running on this host"""
+    if os.name == 'nt':
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill() would terminate the process on Windows
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fail_orphaned_jobs():
+    """
+    Mark failed the pending and running jobs whose process on this host has exited.
+    Jobs owned by other hosts are left alone, since their processes cannot be checked.
+    """
+    host = socket.gethostname()
+    orphaned = []
+    for job_id, worker in GenerationJob.objects.filter(status__in=('pending', 'running')).values_list('id', 'worker'):
+        worker_host, _, pid = worker.rpartition(':')
+        # Jobs from before workers were recorded have no owner left to finish them
+        if not worker or (worker_host == host and not process_alive(int(pid))):
+            orphaned.append(job_id)
+    if orphaned:
+        GenerationJob.objects.filter(pk__in=orphaned, status__in=('pending', 'running')).update(
+            status='failed', error='The server process running this job stopped before it finished',
+            finished_at=timezone.now()
+        )
+    return len(orphaned)
+
+
+def submit_job(name, params=None):
+    """Create a pending job and queue it; returns the GenerationJob"""
+    params = {key: value for key, value in (params or {}).items() if key in GENERATOR_OPTIONS}
+    job = GenerationJob.objects.create(name=name, params=params, worker=worker_id())
+    # Only start once the row is committed, otherwise the worker may not see it
+    transaction.on_commit(lambda: get_executor().submit(run_job, job.id))
+    return job
+
+
+def cancel_job(job):
+    """Request cancellation; pending jobs are cancelled at once"""
+    if job.status in ('succeeded', 'failed', 'cancelled'):
+        return job
+    updated = GenerationJob.objects.filter(pk=job.pk, status='pending').update(
+        status='cancelled', cancel_requested=True, finished_at=timezone.now()
+    )
+    if not updated:
+        GenerationJob.objects.filter(pk=job.pk).update(cancel_requested=True)
+    job.refresh_from_db()
+    return job
+
+
+class JobProgress:
+    """Progress callback that writes to the job row at most every `interval` seconds"""
+
+    def __init__(self, job_id, interval=0.5):
+        self.job_id = job_id
+        self.interval = interval
+        self.last_write = 0.0
+
+    def __call__(self, done, total):
+        now = time.monotonic()
+        if now - self.last_write < self.interval:
+            return
+        self.last_write = now
+        GenerationJob.objects.filter(pk=self.job_id).update(processed_slots=done, total_slots=total)
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """Raise GenerationCancelled if cancellation was requested"""
+        if GenerationJob.objects.filter(pk=self.job_id, cancel_requested=True).exists():
+            raise GenerationCancelled()
+
+
+def run_job(job_id):
+    """Execute one job; runs on a pool thread"""
+    close_old_connections()
+    try:
+        started = GenerationJob.objects.filter(pk=job_id, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        if not started:
+            return
+        job = GenerationJob.objects.get(pk=job_id)
+
+        # Progress is written by JobProgress; this instance only holds the values from before the run
+        fields = ['status', 'timetable', 'stats', 'error', 'finished_at']
+        try:
+            progress = JobProgress(job_id)
+            timetable, stats = get_coordinator().generate(
+                job.name, job.params, progress=progress, check_cancelled=progress.check_cancelled
+            )
+
+            job.refresh_from_db(fields=['total_slots'])
+            job.status = 'succeeded'
+            job.timetable = timetable
+            job.stats = stats
+            job.processed_slots = job.total_slots
+            fields.append('processed_slots')
+        except GenerationCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = timezone.now()
+        job.save(update_fields=fields)
+    finally:
+        # Pool threads keep their own connection; release it between jobs
+        connection.close()
@@ -0,0 +1,137 @@
+import csv
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.models import Timetable
+from api.synthetic import build_institution, parse_breaks
+from api.timetable_generator import TimetableGenerator
+
+PHASES = ['load_time', 'validate_time', 'solve_time', 'write_time']
+
+
+def parse_size(value):
+    """Parse TEACHERSxROOMSxSUBJECTS, e.g. 60x20x30"""
+    try:
+        teachers, rooms, subjects = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise CommandError(f"Invalid size '{value}'. Use TEACHERSxROOMSxSUBJECTS, e.g. 60x20x30.")
+    return teachers, rooms, subjects
+
+
+def current_commit():
+    """Short hash of the checked-out commit, if this is a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Command(BaseCommand):
+    help = ('Time each phase of timetable generation (load, validate, solve, persist) on synthetic '
+            'institutions of increasing size. Replaces all scheduling data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='20x10x15,60x20x30,150x50x60',
+                            help='Comma-separated TEACHERSxROOMSxSUBJECTS sizes')
+        parser.add_argument('--slots-per-day', type=int, default=8)
+        parser.add_argument('--days', type=int, default=6)
+        parser.add_argument('--breaks', default='2:short,4:long')
+        parser.add_argument('--engines', default='greedy', help='Comma-separated solver engines to compare')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per size and engine')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+        parser.add_argument('--memo', action='store_true',
+                            help='Let seeded runs use the solve cache instead of solving every run')
+        parser.add_argument('--output', help='Write results to this .json or .csv file')
+        parser.add_argument('--clear', action='store_true',
+                            help='Confirm that existing scheduling data and timetables are deleted')
+
+    def handle(self, *args, **options):
+        if not options['clear']:
+            raise CommandError('Benchmarking replaces all scheduling data. Pass --clear to confirm.')
+        output = options['output']
+        if output and not output.endswith(('.json', '.csv')):
+            raise CommandError('--output must end in .json or .csv')
+        
+        sizes = [parse_size(size) for size in options['sizes'].split(',') if size.strip()]
+        engines = [engine.strip() for engine in options['engines'].split(',') if engine.strip()]
+        breaks = parse_breaks(options['breaks'])
+        rows = []
+        
+        for teachers, rooms, subjects in sizes:
+            started = time.perf_counter()
+            try:
+                build_institution(
+                    teachers=teachers, subjects=subjects, rooms=rooms,
+                    slots_per_day=options['slots_per_day'], days=options['days'],
+                    breaks=breaks, seed=options['seed']
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            seed_time = round(time.perf_counter() - started, 4)
+            
+            for engine in engines:
+                for run in range(options['repeat']):
+                    try:
+                        generator = TimetableGenerator(engine=engine, seed=run, memoize=options['memo'])
+                    except ValueError as e:
+                        raise CommandError(str(e))
+                    started = time.perf_counter()
+                    timetable = generator.generate_timetable(f'Benchmark {teachers}x{rooms}x{subjects} {engine} #{run}')
+                    total_time = round(time.perf_counter() - started, 4)
+                    Timetable.objects.filter(pk=timetable.pk).delete()
+                    
+                    row = {
+                        'teachers': teachers,
+                        'rooms': rooms,
+                        'subjects': subjects,
+                        'engine': engine,
+                        'run': run,
+                        'seed_time': seed_time,
+                        **{phase: generator.stats.get(phase) for phase in PHASES},
+                        'total_time': total_time,
+                        'lectures_scheduled': generator.stats.get('lectures_scheduled'),
+                        'rows_written': generator.stats.get('rows_written'),
+                        'memo_hit': generator.stats.get('memo_hit', False),
+                    }
+                    rows.append(row)
+                
+                runs = [row for row in rows if row['engine'] == engine and row['teachers'] == teachers
+                        and row['rooms'] == rooms and row['subjects'] == subjects]
+                medians = ' '.join(
+                    f"{phase.replace('_time', '')}={statistics.median(row[phase] for row in runs):.4f}s"
+                    for phase in PHASES + ['total_time']
+                )
+                hits = sum(row['memo_hit'] for row in runs)
+                memoized = f', {hits} memoized' if hits else ''
+                self.stdout.write(f'{teachers}x{rooms}x{subjects} {engine}: {medians} '
+                                  f"({runs[-1]['lectures_scheduled']} lectures{memoized})")
+        
+        if output:
+            self.write_results(output, rows)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(rows)} results to {output}'))
+
+    def write_results(self, path, rows):
+        """Save raw per-run results as JSON (with environment info) or CSV"""
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+                writer.writeheader()
+                writer.writerows(rows)
+            return
+        with open(path, 'w') as f:
+            json.dump({
+                'commit': current_commit(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'results': rows,
+            }, f, indent=2)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.statistics import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the maintained row counters behind /api/stats/ from the tables'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = rebuild_counters()
+        tables = ', '.join(f'{key}={value}' for key, value in counts.items() if not key.startswith('timetable:'))
+        self.stdout.write(self.style.SUCCESS(f'Counters rebuilt: {tables}'))
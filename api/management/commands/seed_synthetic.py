@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.synthetic import build_institution, parse_breaks
+
+
+class Command(BaseCommand):
+    help = 'Replace all scheduling data with a synthetic institution for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=30)
+        parser.add_argument('--subjects', type=int, default=20)
+        parser.add_argument('--rooms', type=int, default=15)
+        parser.add_argument('--slots-per-day', type=int, default=8, help='Lecture slots per day')
+        parser.add_argument('--days', type=int, default=6, help='Working days, Monday first')
+        parser.add_argument('--breaks', default='2:short,4:long',
+                            help='Breaks as "after:type" pairs, e.g. "2:short,4:long"; empty for none')
+        parser.add_argument('--practical-ratio', type=float, default=0.3,
+                            help='Share of practical subjects and labs')
+        parser.add_argument('--subjects-per-teacher', type=int, default=2)
+        parser.add_argument('--wings', default='ABCD', help='Wings that classrooms are spread across')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help='Confirm that existing subjects, teachers, rooms, slots and timetables are deleted')
+
+    def handle(self, *args, **options):
+        if not options['clear']:
+            raise CommandError('This replaces all scheduling data. Pass --clear to confirm.')
+        
+        try:
+            counts = build_institution(
+                teachers=options['teachers'],
+                subjects=options['subjects'],
+                rooms=options['rooms'],
+                slots_per_day=options['slots_per_day'],
+                days=options['days'],
+                breaks=parse_breaks(options['breaks']),
+                practical_ratio=options['practical_ratio'],
+                subjects_per_teacher=options['subjects_per_teacher'],
+                wings=options['wings'],
+                seed=options['seed']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        summary = ', '.join(f'{count} {name.replace("_", " ")}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created synthetic institution: {summary}'))
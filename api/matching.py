@@ -0,0 +1,70 @@
+"""
+Maximum bipartite matching for assigning teachers to rooms within a slot.
+"""
+from collections import deque
+
+
+def hopcroft_karp(left, edges):
+    """
+    Maximum matching between ``left`` vertices and the right vertices listed
+    in ``edges[u]``. Returns {left: right} for every matched left vertex.
+
+    Ties are broken by the order of ``left`` and of each edge list, so callers
+    can shuffle them to get different (equally large) matchings.
+    """
+    match_left = dict.fromkeys(left)
+    match_right = {}
+
+    def layer():
+        """BFS from free left vertices; True if an augmenting path exists"""
+        dist.clear()
+        queue = deque()
+        for u in left:
+            if match_left[u] is None:
+                dist[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in edges[u]:
+                w = match_right.get(v)
+                if w is None:
+                    found = True
+                elif w not in dist:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return found
+
+    def augment(root):
+        """Iterative DFS along BFS layers; flips one augmenting path"""
+        stack = [(root, iter(edges[root]))]
+        via = []
+        while stack:
+            u, rooms = stack[-1]
+            for v in rooms:
+                w = match_right.get(v)
+                if w is None:
+                    via.append(v)
+                    for (x, _), y in zip(stack, via):
+                        match_left[x] = y
+                        match_right[y] = x
+                    return True
+                if dist.get(w) == dist[u] + 1:
+                    via.append(v)
+                    stack.append((w, iter(edges[w])))
+                    break
+            else:
+                # Dead end for this phase
+                dist[u] = None
+                stack.pop()
+                if via:
+                    via.pop()
+        return False
+
+    dist = {}
+    while layer():
+        for u in left:
+            if match_left[u] is None:
+                augment(u)
+
+    return {u: v for u, v in match_left.items() if v is not None}
@@ -0,0 +1,74 @@
+"""
+Content-addressed memoization of solves.
+
+A seeded solve is a pure function of the ProblemInstance and the solver
+parameters. Its result is stored in SolveCacheEntry under a SHA-256 of both,
+so regenerating an unchanged configuration only loads the problem, looks up
+the key and bulk-inserts the stored assignments. Any change to teachers,
+subject links, rooms or slots changes the problem hash, so a stale result
+can never be returned.
+
+The problem hash covers database ids as well as content: assignments are
+stored as indices into the problem's rows, which are ordered by id. The
+same data reloaded with new ids (an import into an emptied database, a
+rebuilt benchmark institution) therefore never hits an older entry.
+
+The cache is bounded least-recently-used by entry count
+(TIMETABLE_SOLVE_CACHE_SIZE, 0 disables it) and by the total number of
+stored lectures (TIMETABLE_SOLVE_CACHE_ROWS).
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SolveCacheEntry
+
+DEFAULT_CACHE_SIZE = 50
+DEFAULT_CACHE_ROWS = 500000
+
+
+def cache_size():
+    return getattr(settings, 'TIMETABLE_SOLVE_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+
+
+def solve_key(problem, params):
+    """Hash of the problem content and the JSON-serializable solver parameters"""
+    digest = hashlib.sha256(problem.fingerprint().encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def load_solution(key):
+    """(assignments, stats) stored under key, or None; marks the entry as recently used"""
+    entry = SolveCacheEntry.objects.filter(key=key).values('id', 'assignments', 'stats').first()
+    if entry is None:
+        return None
+    SolveCacheEntry.objects.filter(pk=entry['id']).update(last_used_at=timezone.now())
+    return [tuple(assignment) for assignment in entry['assignments']], entry['stats']
+
+
+def store_solution(key, engine, assignments, stats):
+    SolveCacheEntry.objects.update_or_create(key=key, defaults={
+        'engine': engine,
+        'assignments': [list(assignment) for assignment in assignments],
+        'stats': stats,
+        'size': len(assignments),
+        'last_used_at': timezone.now(),
+    })
+    evict()
+
+
+def evict():
+    """Drop least recently used entries beyond the entry and lecture limits"""
+    max_rows = getattr(settings, 'TIMETABLE_SOLVE_CACHE_ROWS', DEFAULT_CACHE_ROWS)
+    kept, rows, stale = 0, 0, []
+    for entry_id, size in SolveCacheEntry.objects.order_by('-last_used_at').values_list('id', 'size'):
+        if kept < cache_size() and rows + size <= max_rows:
+            kept += 1
+            rows += size
+        else:
+            stale.append(entry_id)
+    if stale:
+        SolveCacheEntry.objects.filter(id__in=stale).delete()
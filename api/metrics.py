@@ -0,0 +1,249 @@
+"""
+Per-route request metrics in Prometheus text format.
+
+MetricsMiddleware times every request and attributes it to the URL pattern
+that served it (the route name, e.g. "timetable-detail", so ids never become
+labels). For each route and method it records:
+
+- latency as a histogram, plus p50/p90/p99 over the most recent requests;
+- database queries per request as a histogram, and total database time,
+  both measured with connection execute wrappers;
+- time spent in serializers' to_representation(), including any queries
+  they trigger;
+- response bytes and a request count per status code.
+
+A route whose queries-per-request histogram drifts right when the data grows
+has an N+1. GET /api/metrics/ serves the numbers for Prometheus to scrape.
+
+The registry is per server process, like the job pool in api.jobs; each
+process exposes its own counters. Work done after the response is handed
+back (streamed bodies) is not included.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_SAMPLE_SIZE = 1000
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(le, count)] including +Inf"""
+        total, result = 0, []
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RouteStats:
+    def __init__(self, sample_size):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.recent = deque(maxlen=sample_size)
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return []
+        return [(q, ordered[min(len(ordered) - 1, int(q * len(ordered)))]) for q in QUANTILES]
+
+
+class MetricsRegistry:
+    """Thread-safe per-(route, method) statistics"""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.sample_size = sample_size
+
+    def observe(self, route, method, status, request_metrics, latency, size):
+        with self.lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[(route, method)] = RouteStats(self.sample_size)
+            stats.latency.observe(latency)
+            stats.recent.append(latency)
+            stats.queries.observe(request_metrics.queries)
+            stats.db_time += request_metrics.db_time
+            stats.serializer_time += request_metrics.serializer_time
+            if size is not None:
+                stats.response_bytes += size
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+
+    def render(self):
+        """Prometheus text exposition of every route"""
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = []
+
+            def family(name, kind, help_text):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+
+            def histogram(name, attribute):
+                for (route, method), stats in routes:
+                    labels = label_text(route=route, method=method)
+                    histogram = getattr(stats, attribute)
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {number(histogram.sum)}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+            def counter(name, attribute):
+                for (route, method), stats in routes:
+                    lines.append(f'{name}{{{label_text(route=route, method=method)}}} '
+                                 f'{number(getattr(stats, attribute))}')
+
+            family('schedulix_requests_total', 'counter', 'Requests served, by route, method and status.')
+            for (route, method), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'schedulix_requests_total{{{label_text(route=route, method=method, status=status)}}} {count}')
+
+            family('schedulix_request_duration_seconds', 'histogram', 'Request latency.')
+            histogram('schedulix_request_duration_seconds', 'latency')
+
+            family('schedulix_request_latency_seconds', 'summary', 'Request latency quantiles over recent requests.')
+            for (route, method), stats in routes:
+                for quantile, value in stats.quantiles():
+                    lines.append(f'schedulix_request_latency_seconds{{{label_text(route=route, method=method, quantile=quantile)}}} '
+                                 f'{number(value)}')
+                labels = label_text(route=route, method=method)
+                lines.append(f'schedulix_request_latency_seconds_sum{{{labels}}} {number(stats.latency.sum)}')
+                lines.append(f'schedulix_request_latency_seconds_count{{{labels}}} {stats.latency.count}')
+
+            family('schedulix_db_queries', 'histogram', 'Database queries per request.')
+            histogram('schedulix_db_queries', 'queries')
+
+            family('schedulix_db_duration_seconds_total', 'counter', 'Time spent executing database queries.')
+            counter('schedulix_db_duration_seconds_total', 'db_time')
+
+            family('schedulix_serializer_duration_seconds_total', 'counter', 'Time spent serializing responses.')
+            counter('schedulix_serializer_duration_seconds_total', 'serializer_time')
+
+            family('schedulix_response_bytes_total', 'counter', 'Response body bytes, excluding streamed responses.')
+            counter('schedulix_response_bytes_total', 'response_bytes')
+        return '\n'.join(lines) + '\n'
+
+
+def number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+def label_text(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+registry = MetricsRegistry(getattr(settings, 'METRICS_SAMPLE_SIZE', DEFAULT_SAMPLE_SIZE))
+
+
+class RequestMetrics:
+    """Counters for the request being served on this thread"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """Connection execute wrapper"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin that adds its to_representation() time to the request's metrics"""
+
+    def to_representation(self, instance):
+        metrics = current_metrics()
+        if metrics is None or metrics.serializing:
+            # Nested serializers are already inside an outer measurement
+            return super().to_representation(instance)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """Record latency, queries, DB time, serializer time and size for every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = _local.metrics = RequestMetrics()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _local.metrics = None
+        latency = time.perf_counter() - started
+
+        route = route_name(request)
+        if route != 'api-metrics':
+            size = None if response.streaming else len(response.content)
+            registry.observe(route, request.method, response.status_code, metrics, latency, size)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint"""
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 14:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_rows(apps, schema_editor):
+    """Start the counters from the rows already in the database"""
+    DataCounter = apps.get_model('api', 'DataCounter')
+    tables = [
+        ('subjects', 'Subject'),
+        ('teachers', 'Teacher'),
+        ('classrooms', 'Classroom'),
+        ('time_slots', 'TimeSlot'),
+        ('timetables', 'Timetable'),
+        ('timetable_entries', 'TimetableEntry'),
+    ]
+    counters = [
+        DataCounter(key=key, value=apps.get_model('api', model).objects.count())
+        for key, model in tables
+    ]
+    entries = apps.get_model('api', 'TimetableEntry').objects.order_by().values('timetable_id').annotate(count=Count('id'))
+    counters.extend(
+        DataCounter(key=f"timetable:{row['timetable_id']}:entries", value=row['count'])
+        for row in entries
+    )
+    DataCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_generationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_datacounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['teacher', 'timetable', 'day', 'time_slot'], name='entry_teacher_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['classroom', 'timetable', 'day', 'time_slot'], name='entry_room_day_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_entry_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolveCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('engine', models.CharField(max_length=20)),
+                ('assignments', models.JSONField(default=list)),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+def keep_latest_active(apps, schema_editor):
+    """Leave only the newest active timetable active before the constraint is added"""
+    Timetable = apps.get_model('api', 'Timetable')
+    latest = Timetable.objects.filter(is_active=True).order_by('-created_at', '-id').first()
+    if latest is not None:
+        Timetable.objects.filter(is_active=True).exclude(pk=latest.pk).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_solvecacheentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_active, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timetable',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='one_active_timetable'),
+        ),
+    ]
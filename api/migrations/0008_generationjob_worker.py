@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_one_active_timetable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='worker',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
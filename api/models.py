@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 class Subject(models.Model):
     SUBJECT_TYPES = [
@@ -90,9 +90,35 @@ class Timetable(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # At most one active timetable; the partial index also serves the active lookup
+        constraints = [
+            models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True), name='one_active_timetable'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Saving an active timetable deactivates the previous one in the same transaction"""
+        with transaction.atomic():
+            if self.is_active:
+                Timetable.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+            super().save(*args, **kwargs)
+
+class TimetableEntryQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the entries and subtract them from the maintained counts (see api.statistics)"""
+        from .caching import mark_data_changed
+        from .statistics import adjust_counters, count_per_timetable, entry_deltas
+        with transaction.atomic():
+            counts = count_per_timetable(self)
+            result = super().delete()
+            if counts:
+                adjust_counters(entry_deltas(counts, sign=-1))
+                mark_data_changed()
+        return result
+
 class TimetableEntry(models.Model):
     DAY_CHOICES = TimeSlot.DAY_CHOICES
     
@@ -105,17 +131,93 @@ class TimetableEntry(models.Model):
     is_break = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TimetableEntryQuerySet.as_manager()
+
     class Meta:
         unique_together = [
             ['timetable', 'day', 'time_slot', 'teacher'],
             ['timetable', 'day', 'time_slot', 'classroom']
         ]
+        # Per-teacher and per-room lookups; whole-day views use the unique constraints' prefix
+        indexes = [
+            models.Index(fields=['teacher', 'timetable', 'day', 'time_slot'], name='entry_teacher_week_idx'),
+            models.Index(fields=['classroom', 'timetable', 'day', 'time_slot'], name='entry_room_day_idx'),
+        ]
 
     def __str__(self):
         return self.get_entry_display()
     
+    def delete(self, *args, **kwargs):
+        """
+        Delete the entry and subtract it from the maintained counts.
+        Entries have no delete signal receivers, see api.signals.
+        """
+        from .caching import mark_data_changed
+        from .statistics import adjust_counters, entry_deltas
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            adjust_counters(entry_deltas({self.timetable_id: 1}, sign=-1))
+            mark_data_changed()
+        return result
+    
     def get_entry_display(self):
         """Return display string for timetable entry"""
         if self.is_break:
             return f"{self.day} {self.time_slot} - BREAK"
-        return f"{self.day} {self.time_slot} - {self.subject or 'No Subject'} ({self.teacher or 'No Teacher'} in {self.classroom or 'No Classroom'})"
\ No newline at end of file
+        return f"{self.day} {self.time_slot} - {self.subject or 'No Subject'} ({self.teacher or 'No Teacher'} in {self.classroom or 'No Classroom'})"
+
+class GenerationJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    processed_slots = models.PositiveIntegerField(default=0)
+    total_slots = models.PositiveIntegerField(default=0)
+    cancel_requested = models.BooleanField(default=False)
+    # host:pid of the server process whose pool runs the job
+    worker = models.CharField(max_length=100, blank=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_jobs')
+    stats = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percent of slots processed"""
+        if not self.total_slots:
+            return 100.0 if self.status == 'succeeded' else 0.0
+        return round(100.0 * self.processed_slots / self.total_slots, 1)
+
+class DataCounter(models.Model):
+    """Row count kept up to date by api.statistics, e.g. 'subjects' or 'timetable:3:entries'"""
+    key = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+class SolveCacheEntry(models.Model):
+    """A memoized solve, keyed by a hash of the problem and solver parameters; see api.memo"""
+    key = models.CharField(max_length=64, unique=True)
+    engine = models.CharField(max_length=20)
+    # (slot, teacher, subject, room) compact ids into the hashed problem
+    assignments = models.JSONField(default=list)
+    stats = models.JSONField(default=dict, blank=True)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.engine} solve {self.key[:12]} ({self.size} lectures)"
@@ -0,0 +1,92 @@
+"""
+Bitmask occupancy tracking for the timetable generator.
+
+Teachers, classrooms and lecture slots are addressed by their compact ids in a
+ProblemInstance. For every slot the grid keeps one Python int per resource
+kind whose bit ``i`` is set while teacher ``i`` (or room ``i``) is booked, so
+"who is free at slot s" is a single AND / AND-NOT over precomputed masks
+instead of a scan that rebuilds string keys for every resource.
+"""
+from .problem import BOTH, PRACTICAL, THEORY
+
+
+def iter_bits(mask):
+    """Yield the index of every set bit in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class OccupancyGrid:
+    """Teacher x slot and room x slot occupancy stored as integer bitmasks"""
+
+    def __init__(self, problem):
+        slot_count = problem.slot_count
+        self.teacher_busy = [0] * slot_count
+        self.room_busy = [0] * slot_count
+        self.all_rooms = (1 << problem.room_count) - 1
+
+        # Teachers whose working hours cover the start of each slot
+        self.teacher_available = [0] * slot_count
+        for s in range(slot_count):
+            mask = 0
+            for t in range(problem.teacher_count):
+                if problem.teacher_available(t, s):
+                    mask |= 1 << t
+            self.teacher_available[s] = mask
+
+        # Rooms usable for each subject type ('Both' rooms appear in every mask)
+        self.room_type_mask = {THEORY: 0, PRACTICAL: 0}
+        for r, room_type in enumerate(problem.room_types):
+            for subject_type in self.room_type_mask:
+                if room_type == BOTH or room_type == subject_type:
+                    self.room_type_mask[subject_type] |= 1 << r
+
+        # Rooms suitable for at least one of each teacher's subjects
+        self.teacher_rooms = [0] * problem.teacher_count
+        for t, subjects in enumerate(problem.teacher_subjects):
+            for subject in subjects:
+                self.teacher_rooms[t] |= self.room_type_mask.get(problem.subject_types[subject], 0)
+
+        # Per-day lecture counters; a teacher's bit is cleared from
+        # under_limit[day] once they reach lectures_per_day
+        self.lecture_limit = list(problem.lectures_per_day)
+        self.daily_count = {}
+        self.under_limit = {}
+        self._fresh_limit_mask = 0
+        for t, limit in enumerate(self.lecture_limit):
+            if limit > 0:
+                self._fresh_limit_mask |= 1 << t
+
+    def _ensure_day(self, day):
+        if day not in self.daily_count:
+            self.daily_count[day] = [0] * len(self.lecture_limit)
+            self.under_limit[day] = self._fresh_limit_mask
+
+    def free_teachers(self, slot, day):
+        """Mask of teachers available, unbooked and under their daily limit at slot"""
+        self._ensure_day(day)
+        return self.teacher_available[slot] & self.under_limit[day] & ~self.teacher_busy[slot]
+
+    def free_rooms(self, slot, subject_type=None):
+        """Mask of rooms not booked at slot, optionally restricted to a subject type code"""
+        mask = self.all_rooms & ~self.room_busy[slot]
+        if subject_type is not None:
+            mask &= self.room_type_mask.get(subject_type, 0)
+        return mask
+
+    def free_rooms_for(self, slot, teacher):
+        """Mask of unbooked rooms at slot that suit one of the teacher's subjects"""
+        return self.teacher_rooms[teacher] & ~self.room_busy[slot]
+
+    def book(self, slot, day, teacher, room):
+        """Mark teacher and room (compact ids) as busy at slot"""
+        self._ensure_day(day)
+        self.teacher_busy[slot] |= 1 << teacher
+        self.room_busy[slot] |= 1 << room
+
+        counts = self.daily_count[day]
+        counts[teacher] += 1
+        if counts[teacher] >= self.lecture_limit[teacher]:
+            self.under_limit[day] &= ~(1 << teacher)
@@ -0,0 +1,16 @@
+"""
+Pagination for large tables.
+
+The default PageNumberPagination runs a COUNT(*) and an OFFSET scan for every
+page. EntryCursorPagination pages on the primary key instead: each page is
+an index range scan from the last id seen, so page 5000 costs the same as
+page 1, and rows inserted meanwhile never shift or repeat a page.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class EntryCursorPagination(CursorPagination):
+    """Keyset pages of timetable entries in id order; ?page_size= up to 1000"""
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,119 @@
+"""
+Multi-start timetable generation across a process pool.
+
+The randomized engines give a different timetable on every run, so instead of
+regenerating by hand we solve several independently seeded copies of the same
+problem in parallel, score each result and keep the best. Workers receive the
+ORM-free ProblemInstance, which pickles cheaply and does not need Django to
+be configured in the child process.
+"""
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .solvers import get_solver
+
+
+def score_assignments(problem, assignments):
+    """
+    Score a solution given as (slot, teacher, subject, room) compact ids.
+
+    Returns a dict with slots filled, hard-constraint violations and teacher
+    gaps (idle lecture slots between a teacher's first and last lecture of a
+    day). ``rank`` orders solutions: fewest violations, then most slots
+    filled, then fewest gaps.
+    """
+    violations = 0
+    teacher_busy, room_busy = set(), set()
+    lectures = defaultdict(list)
+    for slot, teacher, subject, room in assignments:
+        if (slot, teacher) in teacher_busy:
+            violations += 1
+        if (slot, room) in room_busy:
+            violations += 1
+        teacher_busy.add((slot, teacher))
+        room_busy.add((slot, room))
+        if not problem.room_suits(room, subject):
+            violations += 1
+        if not problem.teacher_available(teacher, slot):
+            violations += 1
+        lectures[(teacher, problem.slot_days[slot])].append(slot)
+
+    gaps = 0
+    for (teacher, day), slots in lectures.items():
+        slots.sort()
+        if len(slots) > problem.lectures_per_day[teacher]:
+            violations += len(slots) - problem.lectures_per_day[teacher]
+        # Slots of a day are numbered consecutively, so ids double as positions
+        gaps += slots[-1] - slots[0] + 1 - len(slots)
+
+        run = 1
+        limit = problem.max_continuous[teacher]
+        for prev, cur in zip(slots, slots[1:]):
+            touching = cur == prev + 1 and problem.slot_start[cur] <= problem.slot_end[prev]
+            run = run + 1 if touching else 1
+            if limit and run > limit:
+                violations += 1
+
+    return {
+        'slots_filled': len(assignments),
+        'violations': violations,
+        'teacher_gaps': gaps,
+        'rank': (-violations, len(assignments), -gaps),
+    }
+
+
+def solve_seed(problem, engine, seed, options=None, progress=None):
+    """Run one seeded solve; executed inside a worker process"""
+    solver = get_solver(engine, seed=seed, **(options or {}))
+    assignments = solver.solve(problem, progress)
+    return {
+        'seed': seed,
+        'assignments': assignments,
+        'solver_stats': solver.stats,
+        'score': score_assignments(problem, assignments),
+    }
+
+
+def multi_start(problem, engine='greedy', seeds=(0,), workers=None, options=None, progress=None):
+    """
+    Solve the problem once per seed and return (best, results).
+
+    ``results`` holds the score of every run; ``best`` is the full result of
+    the highest-ranked run. With one worker or one seed everything runs in the
+    calling process. ``progress(done, total)`` counts slots over all runs.
+    """
+    seeds = list(seeds)
+    if not seeds:
+        raise ValueError("At least one seed is required for multi-start generation.")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(seeds)))
+    total = problem.slot_count * len(seeds)
+
+    if workers == 1:
+        results = []
+        for i, seed in enumerate(seeds):
+            offset = i * problem.slot_count
+            run_progress = (lambda done, _total: progress(offset + done, total)) if progress else None
+            results.append(solve_seed(problem, engine, seed, options, run_progress))
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(solve_seed, problem, engine, seed, options) for seed in seeds]
+            try:
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    if progress:
+                        progress(len(results) * problem.slot_count, total)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        # Keep results in seed order so ties resolve the same way every time
+        order = {seed: i for i, seed in enumerate(seeds)}
+        results.sort(key=lambda result: order[result['seed']])
+
+    best = max(results, key=lambda result: result['score']['rank'])
+    summary = [{'seed': result['seed'], **result['score']} for result in results]
+    for row in summary:
+        row.pop('rank')
+    return best, summary
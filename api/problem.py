@@ -0,0 +1,154 @@
+"""
+Compact, ORM-free description of a timetabling problem.
+
+load_problem() reads every solver input in a fixed number of queries and packs
+it into a ProblemInstance: teachers, subjects, classrooms and lecture slots
+are numbered 0..n-1 (their "compact ids"), times are minutes since midnight,
+and numeric columns are stored in ``array`` tables. The instance holds no
+model objects, so solvers never hit the database and the whole problem
+pickles cheaply for worker processes.
+"""
+import hashlib
+from array import array
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+# Subject and classroom type codes
+THEORY, PRACTICAL, BOTH = 0, 1, 2
+TYPE_CODES = {'Theory': THEORY, 'Practical': PRACTICAL, 'Both': BOTH}
+
+
+def to_minutes(value):
+    """Minutes since midnight for a datetime.time"""
+    return value.hour * 60 + value.minute
+
+
+class ProblemInstance:
+    """
+    Solver input with compact integer ids.
+
+    Per-teacher, per-subject, per-classroom and per-slot attributes live in
+    parallel tables indexed by compact id. Lecture slots are numbered day by
+    day (Monday first) in start-time order, and ``day_slots[day]`` lists the
+    compact ids of that day's slots in order.
+    """
+
+    __slots__ = (
+        'teacher_ids', 'teacher_names', 'teacher_start', 'teacher_end',
+        'lectures_per_day', 'max_continuous', 'teacher_subjects',
+        'subject_ids', 'subject_names', 'subject_types',
+        'room_ids', 'room_types',
+        'slot_ids', 'slot_days', 'slot_start', 'slot_end', 'day_slots',
+        'break_slot_ids', 'break_slot_days',
+    )
+
+    def __init__(self, teachers, subjects, links, classrooms, timeslots):
+        """
+        Build from plain rows:
+
+        teachers   (id, name, start_time, end_time, lectures_per_day, max_continuous_lectures)
+        subjects   (id, name, type)
+        links      (teacher_id, subject_id)
+        classrooms (id, type)
+        timeslots  (id, day, start_time, end_time, is_break)
+        """
+        teachers = sorted(teachers)
+        self.teacher_ids = array('q', (row[0] for row in teachers))
+        self.teacher_names = tuple(row[1] for row in teachers)
+        self.teacher_start = array('i', (to_minutes(row[2]) for row in teachers))
+        self.teacher_end = array('i', (to_minutes(row[3]) for row in teachers))
+        self.lectures_per_day = array('i', (row[4] for row in teachers))
+        self.max_continuous = array('i', (row[5] for row in teachers))
+
+        subjects = sorted(subjects)
+        self.subject_ids = array('q', (row[0] for row in subjects))
+        self.subject_names = tuple(row[1] for row in subjects)
+        self.subject_types = array('b', (TYPE_CODES[row[2]] for row in subjects))
+
+        teacher_index = {teacher_id: i for i, teacher_id in enumerate(self.teacher_ids)}
+        subject_index = {subject_id: i for i, subject_id in enumerate(self.subject_ids)}
+        taught = [[] for _ in teachers]
+        for teacher_id, subject_id in links:
+            if teacher_id in teacher_index and subject_id in subject_index:
+                taught[teacher_index[teacher_id]].append(subject_index[subject_id])
+        self.teacher_subjects = tuple(tuple(sorted(subs)) for subs in taught)
+
+        classrooms = sorted(classrooms)
+        self.room_ids = array('q', (row[0] for row in classrooms))
+        self.room_types = array('b', (TYPE_CODES[row[1]] for row in classrooms))
+
+        day_order = {day: i for i, day in enumerate(DAYS)}
+        lectures = sorted(
+            (row for row in timeslots if not row[4] and row[1] in day_order),
+            key=lambda row: (day_order[row[1]], row[2], row[3])
+        )
+        self.slot_ids = array('q', (row[0] for row in lectures))
+        self.slot_days = tuple(row[1] for row in lectures)
+        self.slot_start = array('i', (to_minutes(row[2]) for row in lectures))
+        self.slot_end = array('i', (to_minutes(row[3]) for row in lectures))
+        day_slots = {day: [] for day in DAYS}
+        for i, day in enumerate(self.slot_days):
+            day_slots[day].append(i)
+        self.day_slots = {day: tuple(slots) for day, slots in day_slots.items()}
+
+        breaks = sorted(
+            (row for row in timeslots if row[4] and row[1] in day_order),
+            key=lambda row: (day_order[row[1]], row[2], row[3])
+        )
+        self.break_slot_ids = array('q', (row[0] for row in breaks))
+        self.break_slot_days = tuple(row[1] for row in breaks)
+
+    @property
+    def teacher_count(self):
+        return len(self.teacher_ids)
+
+    @property
+    def subject_count(self):
+        return len(self.subject_ids)
+
+    @property
+    def room_count(self):
+        return len(self.room_ids)
+
+    @property
+    def slot_count(self):
+        return len(self.slot_ids)
+
+    def room_suits(self, room, subject):
+        """Check if classroom (compact id) is suitable for the subject (compact id)"""
+        room_type = self.room_types[room]
+        return room_type == BOTH or room_type == self.subject_types[subject]
+
+    def teacher_available(self, teacher, slot):
+        """Check if the slot starts within the teacher's working hours"""
+        return self.teacher_start[teacher] <= self.slot_start[slot] <= self.teacher_end[teacher]
+
+    def fingerprint(self):
+        """
+        SHA-256 of every solver input, database ids included; equal problems
+        hash the same whatever order rows were read in
+        """
+        digest = hashlib.sha256()
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if name == 'day_slots':
+                value = tuple(value[day] for day in DAYS)
+            elif isinstance(value, array):
+                value = tuple(value)
+            digest.update(f'{name}={value!r};'.encode())
+        return digest.hexdigest()
+
+
+def load_problem():
+    """Read all solver inputs in five queries and build a ProblemInstance"""
+    from .models import Subject, Teacher, TeacherSubject, Classroom, TimeSlot
+
+    return ProblemInstance(
+        teachers=Teacher.objects.values_list(
+            'id', 'name', 'start_time', 'end_time', 'lectures_per_day', 'max_continuous_lectures'
+        ),
+        subjects=Subject.objects.values_list('id', 'name', 'type'),
+        links=TeacherSubject.objects.values_list('teacher_id', 'subject_id'),
+        classrooms=Classroom.objects.values_list('id', 'type'),
+        timeslots=TimeSlot.objects.values_list('id', 'day', 'start_time', 'end_time', 'is_break'),
+    )
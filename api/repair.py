@@ -0,0 +1,199 @@
+"""
+Incremental repair of a generated timetable after its input data changes.
+
+Instead of regenerating everything, TimetableRepairer checks every entry of
+a timetable against the current teachers, subjects, classrooms and time
+slots. Entries that no longer hold are dropped. Only the slots they leave
+behind (plus any slots the caller names, e.g. ones whose entries were
+cascade-deleted) are re-solved, against the lectures that stay. Only the
+changed rows are written, so the rest of the published schedule is
+untouched. Slots that were already empty stay empty; name them to have
+them filled.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .active import active_timetable_id
+from .caching import mark_data_changed
+from .models import Timetable, TimetableEntry
+from .occupancy import OccupancyGrid, iter_bits
+from .problem import load_problem
+from .solvers import GreedySolver
+from .statistics import adjust_counters, claim_input_version, entry_deltas, input_version
+from .timetable_generator import DEFAULT_ATTEMPTS, InputsChanged
+
+
+class TimetableRepairer:
+    """Re-solve only the slots of a timetable invalidated by data edits"""
+
+    def __init__(self, seed=None, attempts=None):
+        self.solver = GreedySolver(seed=seed)
+        self.attempts = attempts or getattr(settings, 'TIMETABLE_GENERATION_ATTEMPTS', DEFAULT_ATTEMPTS)
+        self.stats = {}
+
+    def repair(self, timetable, slot_ids=()):
+        """
+        Repair timetable in place; slot_ids are extra TimeSlot ids to re-solve.
+
+        Like the generator, the repair is planned outside any transaction and
+        only written if the inputs are still at the version it read, starting
+        over up to self.attempts times.
+        """
+        started = time.perf_counter()
+        for attempt in range(1, self.attempts + 1):
+            version = input_version()
+            problem = load_problem()
+            if input_version() != version:
+                # Changed while loading; the snapshot may be torn
+                continue
+            stale, kept, new_entries, dirty = self.plan(timetable, problem, slot_ids)
+
+            with transaction.atomic():
+                if not claim_input_version(version):
+                    continue
+                # The entry queryset's delete() subtracts the stale entries from the counters itself
+                if stale:
+                    TimetableEntry.objects.filter(id__in=[entry_id for entry_id, _ in stale]).delete()
+                if new_entries:
+                    TimetableEntry.objects.bulk_create(new_entries)
+                    adjust_counters(entry_deltas({timetable.pk: len(new_entries)}))
+                    mark_data_changed()
+
+            self.stats = {
+                'attempts': attempt,
+                'entries_kept': kept,
+                'entries_removed': len(stale),
+                'entries_added': len(new_entries),
+                'slots_resolved': len(dirty),
+                'repair_time': round(time.perf_counter() - started, 4),
+            }
+            return self.stats
+
+        raise InputsChanged(
+            f"Subjects, teachers, classrooms or time slots changed during each of {self.attempts} "
+            f"repair attempts. Please try again."
+        )
+
+    def plan(self, timetable, problem, slot_ids):
+        """Return the stale (entry_id, slot) pairs, the kept entry count, the new entries and the re-solved slots"""
+        rows = list(timetable.entries.values_list(
+            'id', 'day', 'time_slot_id', 'teacher_id', 'subject_id', 'classroom_id', 'is_break'
+        ))
+
+        stale, kept_breaks = self.check_breaks(problem, rows)
+        lectures, invalid = self.check_lectures(problem, rows)
+        stale.extend(invalid)
+
+        # Book the surviving lectures, then drop any that break a daily or continuous limit
+        grid = OccupancyGrid(problem)
+        self.solver.subject_load = [0] * problem.subject_count
+        kept = []
+        for entry_id, (slot, teacher, subject, room) in sorted(lectures.items(), key=lambda item: item[1]):
+            day = problem.slot_days[slot]
+            fits = grid.free_teachers(slot, day) >> teacher & 1 and not grid.room_busy[slot] >> room & 1
+            if not fits or self.too_long(problem, grid, slot, teacher):
+                stale.append((entry_id, slot))
+                continue
+            grid.book(slot, day, teacher, room)
+            self.solver.subject_load[subject] += 1
+            kept.append(entry_id)
+
+        # Re-solve only the slots that lost lectures and the slots the caller named
+        slot_index = {slot_id: i for i, slot_id in enumerate(problem.slot_ids)}
+        dirty = {slot for _, slot in stale if slot is not None}
+        dirty.update(slot_index[slot_id] for slot_id in slot_ids if slot_id in slot_index)
+
+        new_entries = []
+        for slot in sorted(dirty):
+            day = problem.slot_days[slot]
+            blocked = 0
+            for teacher in iter_bits(grid.free_teachers(slot, day)):
+                if self.too_long(problem, grid, slot, teacher):
+                    blocked |= 1 << teacher
+            for _, teacher, subject, room in self.solver.fill_slot(problem, slot, day, grid, blocked):
+                new_entries.append(TimetableEntry(
+                    timetable=timetable,
+                    day=day,
+                    time_slot_id=problem.slot_ids[slot],
+                    subject_id=problem.subject_ids[subject],
+                    teacher_id=problem.teacher_ids[teacher],
+                    classroom_id=problem.room_ids[room]
+                ))
+        for time_slot_id, day in zip(problem.break_slot_ids, problem.break_slot_days):
+            if time_slot_id not in kept_breaks:
+                new_entries.append(TimetableEntry(timetable=timetable, day=day, time_slot_id=time_slot_id, is_break=True))
+        return stale, len(kept) + len(kept_breaks), new_entries, dirty
+
+    def check_breaks(self, problem, rows):
+        """Split break entries into stale (entry_id, None) pairs and the break slot ids still covered"""
+        breaks = dict(zip(problem.break_slot_ids, problem.break_slot_days))
+        stale, kept = [], set()
+        for entry_id, day, time_slot_id, _, _, _, is_break in rows:
+            if not is_break:
+                continue
+            if breaks.get(time_slot_id) != day or time_slot_id in kept:
+                stale.append((entry_id, None))
+            else:
+                kept.add(time_slot_id)
+        return stale, kept
+
+    def check_lectures(self, problem, rows):
+        """Map valid lecture entries to compact (slot, teacher, subject, room); return them and the stale ones"""
+        slot_index = {slot_id: i for i, slot_id in enumerate(problem.slot_ids)}
+        teacher_index = {teacher_id: i for i, teacher_id in enumerate(problem.teacher_ids)}
+        subject_index = {subject_id: i for i, subject_id in enumerate(problem.subject_ids)}
+        room_index = {room_id: i for i, room_id in enumerate(problem.room_ids)}
+
+        lectures, stale = {}, []
+        for entry_id, day, time_slot_id, teacher_id, subject_id, classroom_id, is_break in rows:
+            if is_break:
+                continue
+            slot = slot_index.get(time_slot_id)
+            teacher = teacher_index.get(teacher_id)
+            subject = subject_index.get(subject_id)
+            room = room_index.get(classroom_id)
+            if slot is None or problem.slot_days[slot] != day:
+                # The slot became a break or moved to another day
+                stale.append((entry_id, slot))
+            elif teacher is None or subject is None or room is None \
+                    or subject not in problem.teacher_subjects[teacher] \
+                    or not problem.room_suits(room, subject) \
+                    or not problem.teacher_available(teacher, slot):
+                stale.append((entry_id, slot))
+            else:
+                lectures[entry_id] = (slot, teacher, subject, room)
+        return lectures, stale
+
+    @staticmethod
+    def too_long(problem, grid, slot, teacher):
+        """True if teaching at slot would exceed the teacher's continuous-lecture limit"""
+        limit = problem.max_continuous[teacher]
+        return bool(limit) and TimetableRepairer.run_length(problem, grid, slot, teacher) > limit
+
+    @staticmethod
+    def run_length(problem, grid, slot, teacher):
+        """Continuous run the teacher would teach if they also took slot"""
+        bit = 1 << teacher
+        slots = problem.day_slots[problem.slot_days[slot]]
+        position = slots.index(slot)
+        length = 1
+        for step in (-1, 1):
+            i = position
+            while 0 <= i + step < len(slots):
+                a, b = sorted((slots[i], slots[i + step]))
+                if problem.slot_start[b] > problem.slot_end[a] or not grid.teacher_busy[slots[i + step]] & bit:
+                    break
+                length += 1
+                i += step
+        return length
+
+
+def repair_active_timetable(slot_ids=()):
+    """Repair the active timetable, if there is one; returns the repair stats or None"""
+    active_id = active_timetable_id()
+    timetable = Timetable.objects.filter(pk=active_id).first() if active_id else None
+    if timetable is None:
+        return None
+    return TimetableRepairer().repair(timetable, slot_ids)
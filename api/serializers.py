@@ -1,17 +1,20 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry
+from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry, GenerationJob
+from .metrics import TimedSerializerMixin
+from .sparse import DynamicFieldsMixin
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Subject
         fields = '__all__'
 
-class ClassroomSerializer(serializers.ModelSerializer):
+class ClassroomSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Classroom
         fields = '__all__'
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     subjects = serializers.PrimaryKeyRelatedField(many=True, queryset=Subject.objects.all())
     
     class Meta:
@@ -36,12 +39,12 @@ class TeacherSerializer(serializers.ModelSerializer):
         
         return instance
 
-class TimeSlotSerializer(serializers.ModelSerializer):
+class TimeSlotSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TimeSlot
         fields = '__all__'
 
-class TimetableEntrySerializer(serializers.ModelSerializer):
+class TimetableEntrySerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     subject_data = SubjectSerializer(source='subject', read_only=True)
     teacher_data = TeacherSerializer(source='teacher', read_only=True)
     classroom_data = ClassroomSerializer(source='classroom', read_only=True)
@@ -52,6 +55,11 @@ class TimetableEntrySerializer(serializers.ModelSerializer):
         fields = ['id', 'timetable', 'day', 'time_slot', 'time_slot_data',
                  'subject', 'subject_data', 'teacher', 'teacher_data', 
                  'classroom', 'classroom_data', 'is_break', 'created_at']
+        # ?expand= names mapped to the nested fields they control
+        expandable = {'subject': 'subject_data', 'teacher': 'teacher_data',
+                      'classroom': 'classroom_data', 'time_slot': 'time_slot_data'}
+        # Read by to_representation even when not requested
+        required_columns = ['is_break']
         
     def to_representation(self, instance):
         """Custom representation to handle break entries"""
@@ -59,12 +67,9 @@ class TimetableEntrySerializer(serializers.ModelSerializer):
         
         # For break entries, don't serialize the related objects
         if instance.is_break:
-            representation['subject'] = None
-            representation['teacher'] = None 
-            representation['classroom'] = None
-            representation['subject_data'] = None
-            representation['teacher_data'] = None
-            representation['classroom_data'] = None
+            for field in ('subject', 'teacher', 'classroom', 'subject_data', 'teacher_data', 'classroom_data'):
+                if field in representation:
+                    representation[field] = None
             
         return representation
     
@@ -102,9 +107,69 @@ class TimetableEntrySerializer(serializers.ModelSerializer):
         
         return data
 
-class TimetableSerializer(serializers.ModelSerializer):
+class TimetableEntryIdSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Entry with related objects as ids only; used by the normalized format"""
+    class Meta:
+        model = TimetableEntry
+        fields = ['id', 'timetable', 'day', 'time_slot', 'subject', 'teacher', 'classroom', 'is_break', 'created_at']
+
+def normalize_entries(entries):
+    """
+    Serialize entries with ids only and side-load each referenced subject,
+    teacher, classroom and time slot once, keyed by id.
+    Entries should come with select_related rows and teacher__subjects prefetched.
+    """
+    related = {'subjects': {}, 'teachers': {}, 'classrooms': {}, 'time_slots': {}}
+    for entry in entries:
+        related['time_slots'].setdefault(entry.time_slot_id, entry.time_slot)
+        if not entry.is_break:
+            for key, obj in (('subjects', entry.subject), ('teachers', entry.teacher), ('classrooms', entry.classroom)):
+                if obj is not None:
+                    related[key].setdefault(obj.pk, obj)
+    
+    data = {'entries': TimetableEntryIdSerializer(entries, many=True).data}
+    for key, serializer_class in (('subjects', SubjectSerializer), ('teachers', TeacherSerializer),
+                                  ('classrooms', ClassroomSerializer), ('time_slots', TimeSlotSerializer)):
+        objects = related[key].values()
+        data[key] = {str(item['id']): item for item in serializer_class(objects, many=True).data}
+    return data
+
+class TimetableSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     entries = TimetableEntrySerializer(many=True, read_only=True)
     
     class Meta:
         model = Timetable
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        expandable = {'entries': 'entries'}
+        # Timetable.save() swaps the active timetable; the one_active_timetable validator would refuse it
+        extra_kwargs = {'is_active': {'validators': []}}
+
+class TimetableSummarySerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    """Timetable without its entries; counts come from queryset annotations"""
+    entry_count = serializers.IntegerField(read_only=True)
+    lecture_count = serializers.IntegerField(read_only=True)
+    break_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Timetable
+        fields = ['id', 'name', 'is_active', 'created_at', 'entry_count', 'lecture_count', 'break_count']
+        extra_kwargs = {'is_active': {'validators': []}}
+
+class GenerationJobSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+    elapsed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = GenerationJob
+        fields = ['id', 'name', 'params', 'status', 'progress', 'processed_slots', 'total_slots',
+                 'elapsed', 'timetable', 'stats', 'error', 'cancel_requested',
+                 'created_at', 'started_at', 'finished_at']
+        read_only_fields = ['status', 'processed_slots', 'total_slots', 'timetable', 'stats',
+                           'error', 'cancel_requested', 'started_at', 'finished_at']
+
+    def get_elapsed(self, obj):
+        """Seconds since the job started, or its total run time once finished"""
+        if not obj.started_at:
+            return None
+        end = obj.finished_at or timezone.now()
+        return round((end - obj.started_at).total_seconds(), 2)
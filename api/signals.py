@@ -0,0 +1,47 @@
+"""
+Signal wiring for the versioned read cache, the maintained row counts and
+the generator's input version.
+
+Saves and deletes of the scheduling models bump the data version and adjust
+the counters in api.statistics. Timetable entries only get a post_save
+receiver: a delete receiver would stop Django from fast-deleting the entries
+cascaded from a timetable, teacher or room, so parents count their cascaded
+entries in pre_delete. Direct entry deletes, from instances or querysets
+(the API, the admin, the repairer), account for themselves in the model's
+and the queryset's delete().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .caching import mark_data_changed
+from .models import Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable, TimetableEntry
+from .statistics import CASCADE_FIELDS, INPUT_MODELS, TABLE_KEYS, collect_cascade, inputs_changed, row_deleted, row_saved
+
+VERSIONED_MODELS = [Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable]
+
+
+def connect_signals():
+    for model in VERSIONED_MODELS:
+        post_save.connect(mark_data_changed, sender=model, dispatch_uid=f'data-version-save-{model.__name__}')
+        post_delete.connect(mark_data_changed, sender=model, dispatch_uid=f'data-version-delete-{model.__name__}')
+    post_save.connect(mark_data_changed, sender=TimetableEntry, dispatch_uid='data-version-save-TimetableEntry')
+    m2m_changed.connect(teacher_subjects_changed, sender=Teacher.subjects.through, dispatch_uid='teacher-subjects-changed')
+
+    for model in TABLE_KEYS:
+        post_save.connect(row_saved, sender=model, dispatch_uid=f'counter-save-{model.__name__}')
+        if model is not TimetableEntry:
+            post_delete.connect(row_deleted, sender=model, dispatch_uid=f'counter-delete-{model.__name__}')
+    for model in CASCADE_FIELDS:
+        pre_delete.connect(collect_cascade, sender=model, dispatch_uid=f'counter-cascade-{model.__name__}')
+
+    # Bumped inside the writer's transaction, unlike the cache version
+    for model in INPUT_MODELS:
+        post_save.connect(inputs_changed, sender=model, dispatch_uid=f'input-version-save-{model.__name__}')
+        post_delete.connect(inputs_changed, sender=model, dispatch_uid=f'input-version-delete-{model.__name__}')
+
+
+def teacher_subjects_changed(action, **kwargs):
+    """m2m_changed fires before and after each write to a teacher's subjects; count the write once, after it"""
+    if not action.startswith('post_'):
+        return
+    mark_data_changed()
+    inputs_changed()
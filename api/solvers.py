@@ -0,0 +1,545 @@
+"""
+Solver engines for the timetable generator.
+
+Every engine takes a ProblemInstance and returns a list of
+``(slot, teacher, subject, room)`` assignments expressed as compact ids.
+Engines never touch the database; TimetableGenerator turns the assignments
+into TimetableEntry rows.
+
+``solve`` accepts an optional ``progress(done, total)`` callback that is
+called as slots are processed. The callback may raise GenerationCancelled to
+abort the solve.
+"""
+import random
+
+from .matching import hopcroft_karp
+from .occupancy import OccupancyGrid, iter_bits
+from .problem import BOTH, DAYS, PRACTICAL, THEORY
+
+
+class GenerationCancelled(Exception):
+    """Raised by a progress callback to stop a running solve"""
+
+
+class GreedySolver:
+    """
+    Randomized pass over the slots of each day.
+
+    Each slot is filled with a maximum matching between the teachers free at
+    that slot and the free rooms that suit one of their subjects, so a slot
+    uses as many rooms as it can instead of stopping at the first lecture.
+    """
+
+    name = 'greedy'
+
+    def __init__(self, seed=None, **options):
+        self.random = random.Random(seed)
+        self.stats = {}
+
+    def solve(self, problem, progress=None):
+        """Generate conflict-free assignments"""
+        # Track assignments to avoid conflicts (bitmasks over compact ids)
+        grid = OccupancyGrid(problem)
+        assignments = []
+        # Lectures given per subject, used to spread teachers over their subjects
+        self.subject_load = [0] * problem.subject_count
+
+        for day in DAYS:
+            self.solve_day(problem, day, grid, assignments, progress)
+
+        self.stats = {'lectures_scheduled': len(assignments)}
+        return assignments
+
+    def solve_day(self, problem, day, grid, assignments, progress=None):
+        """Generate schedule for a single day"""
+        last_slot = {}
+        run_len = {}
+        prev = None
+        for slot in problem.day_slots[day]:
+            if progress:
+                progress(slot, problem.slot_count)
+
+            # Teachers who would exceed their continuous-lecture limit sit this slot out
+            touching = prev is not None and problem.slot_start[slot] <= problem.slot_end[prev]
+            tired = 0
+            if touching:
+                for teacher, slot_taught in last_slot.items():
+                    limit = problem.max_continuous[teacher]
+                    if slot_taught == prev and limit and run_len[teacher] >= limit:
+                        tired |= 1 << teacher
+
+            for lecture in self.fill_slot(problem, slot, day, grid, blocked=tired):
+                assignments.append(lecture)
+                teacher = lecture[1]
+                continuing = touching and last_slot.get(teacher) == prev
+                run_len[teacher] = run_len[teacher] + 1 if continuing else 1
+                last_slot[teacher] = slot
+            prev = slot
+
+    def fill_slot(self, problem, slot, day, grid, blocked=0):
+        """Book a maximum teacher-room matching at slot; returns the new assignments"""
+        # Find available teachers for this timeslot, shuffled for random assignment
+        available_teachers = list(iter_bits(grid.free_teachers(slot, day) & ~blocked))
+        self.random.shuffle(available_teachers)
+
+        edges = {}
+        for teacher in available_teachers:
+            rooms = list(iter_bits(grid.free_rooms_for(slot, teacher)))
+            self.random.shuffle(rooms)
+            edges[teacher] = rooms
+
+        booked = []
+        for teacher, room in hopcroft_karp(available_teachers, edges).items():
+            subject = self.pick_subject(problem, teacher, room)
+            booked.append((slot, teacher, subject, room))
+            grid.book(slot, day, teacher, room)
+            self.subject_load[subject] += 1
+        return booked
+
+    def pick_subject(self, problem, teacher, room):
+        """Least-taught of the teacher's subjects that the room suits"""
+        subjects = [s for s in problem.teacher_subjects[teacher] if problem.room_suits(room, s)]
+        fewest = min(self.subject_load[s] for s in subjects)
+        return self.random.choice([s for s in subjects if self.subject_load[s] == fewest])
+
+
+# Room groups used by the CSP engine: teachers whose subjects need Theory
+# rooms, need Practical rooms, or can use any room
+ANY = BOTH
+GROUPS = (THEORY, PRACTICAL, ANY)
+
+
+def max_picks(mask, adjacent, max_run, last=-1, run_len=0):
+    """Most lectures that fit in the slots of mask given the continuous-run limit"""
+    picks = 0
+    prev, run = last, run_len
+    for slot in iter_bits(mask):
+        if prev >= 0 and slot == prev + 1 and adjacent[prev]:
+            if run >= max_run:
+                # Skip this slot; the run resets after it
+                prev, run = slot, 0
+                continue
+            run += 1
+        else:
+            run = 1
+        picks += 1
+        prev = slot
+    return picks
+
+
+def run_through(slots, slot, adjacent):
+    """Length of the continuous run of lectures in slots that contains slot"""
+    length = 1
+    i = slot
+    while i > 0 and adjacent[i - 1] and (i - 1) in slots:
+        length += 1
+        i -= 1
+    i = slot
+    while adjacent[i] and (i + 1) in slots:
+        length += 1
+        i += 1
+    return length
+
+
+class DaySearch:
+    """Variables, domains and search state for one day of the CSP engine"""
+
+    def __init__(self, adjacent, limit, total_rooms, group, avail, max_run):
+        self.adjacent = adjacent
+        self.limit = limit
+        self.total_rooms = total_rooms
+        self.group = group
+        self.avail = avail
+        self.max_run = max_run
+        self.m = len(adjacent)
+        self.full = (1 << self.m) - 1
+        # Degree: number of other teachers whose windows overlap this one
+        self.degree = {t: sum(1 for u in avail if u != t and avail[u] & avail[t]) for t in avail}
+
+    def reset(self, demand):
+        self.open_mask = {g: self.full for g in GROUPS}
+        self.counts = {g: [0] * self.m for g in GROUPS}
+        self.placed = {t: [] for t in demand}
+        self.last = {t: -1 for t in demand}
+        self.run_len = {t: 0 for t in demand}
+        self.remaining = dict(demand)
+        self.unfinished = {t for t, wanted in demand.items() if wanted > 0}
+
+    def level(self, demand):
+        """
+        Trim demand that can never be met so the search does not thrash.
+
+        A slot cannot host more lectures than it has rooms, nor more than the
+        teachers available at it; the same holds per room group. While total
+        demand exceeds that supply bound, the largest remaining demand in the
+        offending group is lowered by one.
+        """
+        available = {g: [0] * self.m for g in GROUPS}
+        for t, mask in self.avail.items():
+            for slot in iter_bits(mask):
+                available[self.group[t]][slot] += 1
+
+        slots = range(self.m)
+        supply = {
+            THEORY: sum(min(self.limit[THEORY], available[THEORY][i]) for i in slots),
+            PRACTICAL: sum(min(self.limit[PRACTICAL], available[PRACTICAL][i]) for i in slots),
+            None: sum(min(self.total_rooms, sum(available[g][i] for g in GROUPS)) for i in slots),
+        }
+        leveled = dict(demand)
+        for g in (THEORY, PRACTICAL, None):
+            members = [t for t in leveled if g is None or self.group[t] == g]
+            excess = sum(leveled[t] for t in members) - supply[g]
+            while excess > 0:
+                t = max(members, key=lambda u: (leveled[u], u))
+                leveled[t] -= 1
+                excess -= 1
+        return leveled
+
+    # Domains -----------------------------------------------------------
+
+    def viable(self, t):
+        """Open slots after the teacher's last lecture"""
+        after = self.full & ~((1 << (self.last[t] + 1)) - 1)
+        return self.avail[t] & after & self.open_mask[self.group[t]]
+
+    def reachable(self, t):
+        return max_picks(self.viable(t), self.adjacent, self.max_run[t], self.last[t], self.run_len[t])
+
+    def candidates(self, t):
+        last = self.last[t]
+        values = []
+        for slot in iter_bits(self.viable(t)):
+            if last >= 0 and slot == last + 1 and self.adjacent[last] and self.run_len[t] >= self.max_run[t]:
+                continue
+            values.append(slot)
+        return values
+
+    def select_variable(self):
+        """Minimum remaining values, ties broken by highest degree"""
+        best, best_key = None, None
+        for t in self.unfinished:
+            key = (self.viable(t).bit_count() - self.remaining[t], -self.degree[t], t)
+            if best_key is None or key < best_key:
+                best, best_key = t, key
+        return best
+
+    # Assignment --------------------------------------------------------
+
+    def _refresh_slot(self, slot):
+        """Recompute which groups can still use slot; return groups that just closed"""
+        closed = []
+        bit = 1 << slot
+        everyone = self.counts[ANY][slot] < self.total_rooms
+        for g in GROUPS:
+            ok = everyone and (g == ANY or self.counts[g][slot] < self.limit[g])
+            if not ok and self.open_mask[g] & bit:
+                self.open_mask[g] &= ~bit
+                closed.append(g)
+            elif ok:
+                self.open_mask[g] |= bit
+        return closed
+
+    def assign(self, t, slot):
+        undo = (t, slot, self.last[t], self.run_len[t])
+        last = self.last[t]
+        self.placed[t].append(slot)
+        if last >= 0 and slot == last + 1 and self.adjacent[last]:
+            self.run_len[t] += 1
+        else:
+            self.run_len[t] = 1
+        self.last[t] = slot
+        self.remaining[t] -= 1
+        if not self.remaining[t]:
+            self.unfinished.discard(t)
+        self.counts[ANY][slot] += 1
+        if self.group[t] != ANY:
+            self.counts[self.group[t]][slot] += 1
+        return undo, self._refresh_slot(slot)
+
+    def unassign(self, undo):
+        t, slot, last, run_len = undo
+        self.placed[t].pop()
+        self.last[t] = last
+        self.run_len[t] = run_len
+        if not self.remaining[t]:
+            self.unfinished.add(t)
+        self.remaining[t] += 1
+        self.counts[ANY][slot] -= 1
+        if self.group[t] != ANY:
+            self.counts[self.group[t]][slot] -= 1
+        self._refresh_slot(slot)
+
+    def forward_check(self, t, closed):
+        """False if t or any teacher sharing a newly closed slot can no longer meet demand"""
+        if self.remaining[t] and self.reachable(t) < self.remaining[t]:
+            return False
+        if not closed:
+            return True
+        affected = set(GROUPS) if ANY in closed else set(closed)
+        return all(self.reachable(u) >= self.remaining[u] for u in self.unfinished if self.group[u] in affected)
+
+    # Strategies ----------------------------------------------------------
+
+    def backtrack(self, max_nodes):
+        """
+        Depth-first search for full coverage of the current demand.
+
+        Returns (complete, nodes, best) where best is the deepest partial
+        assignment seen at a dead end.
+        """
+        nodes = 0
+        best_depth, best = -1, {}
+        stack = []
+        var = self.select_variable()
+        frame = [var, self.candidates(var), 0, None]
+
+        while self.unfinished:
+            var, values, pos, undo = frame
+            if undo is not None:
+                self.unassign(undo)
+                frame[3] = None
+
+            advanced = False
+            while pos < len(values) and nodes < max_nodes:
+                slot = values[pos]
+                pos += 1
+                nodes += 1
+                undo, closed = self.assign(var, slot)
+                if self.forward_check(var, closed):
+                    frame[2], frame[3] = pos, undo
+                    stack.append(frame)
+                    nxt = self.select_variable()
+                    frame = [nxt, self.candidates(nxt) if nxt is not None else [], 0, None]
+                    advanced = True
+                    break
+                self.unassign(undo)
+
+            if advanced:
+                continue
+            # Dead end: remember the deepest partial assignment before undoing it
+            if len(stack) > best_depth:
+                best_depth = len(stack)
+                best = {t: list(slots) for t, slots in self.placed.items()}
+            if nodes >= max_nodes or not stack:
+                break
+            frame = stack.pop()
+
+        if not self.unfinished:
+            return True, nodes, self.placed
+        return False, nodes, best
+
+    def relaxed(self):
+        """
+        Single MRV pass without backtracking.
+
+        A teacher whose remaining demand no longer fits gives up the excess
+        instead of forcing a backtrack, so the pass always terminates.
+        """
+        while self.unfinished:
+            t = self.select_variable()
+            reachable = self.reachable(t)
+            if reachable < self.remaining[t]:
+                self.remaining[t] = reachable
+            if not self.remaining[t]:
+                self.unfinished.discard(t)
+                continue
+            for slot in self.candidates(t):
+                undo, _closed = self.assign(t, slot)
+                if not self.remaining[t] or self.reachable(t) >= self.remaining[t]:
+                    break
+                self.unassign(undo)
+        return self.placed
+
+    def top_up(self, placed, demand):
+        """Greedily add any lecture that still fits on top of placed"""
+        counts = {g: [0] * self.m for g in GROUPS}
+        for t, slots in placed.items():
+            for slot in slots:
+                counts[ANY][slot] += 1
+                if self.group[t] != ANY:
+                    counts[self.group[t]][slot] += 1
+
+        result = {}
+        for t in sorted(demand):
+            g = self.group[t]
+            taken = set(placed.get(t, ()))
+            for slot in iter_bits(self.avail[t]):
+                if len(taken) >= demand[t]:
+                    break
+                if slot in taken or counts[ANY][slot] >= self.total_rooms:
+                    continue
+                if g != ANY and counts[g][slot] >= self.limit[g]:
+                    continue
+                if run_through(taken | {slot}, slot, self.adjacent) > self.max_run[t]:
+                    continue
+                taken.add(slot)
+                counts[ANY][slot] += 1
+                if g != ANY:
+                    counts[g][slot] += 1
+            result[t] = sorted(taken)
+        return result
+
+
+class CSPSolver:
+    """
+    Deterministic backtracking search with forward checking.
+
+    Each day is solved independently. Every teacher asks for
+    ``lectures_per_day`` lectures (capped by what their availability window
+    and ``max_continuous_lectures`` allow); a teacher's lectures are placed in
+    increasing slot order, so the variable for a teacher is always "their next
+    lecture" and its domain is the set of later slots that are inside the
+    availability window, keep the continuous run within the limit and still
+    have a suitable room free.
+
+    Rooms are tracked as per-slot capacities rather than individual rooms.
+    Teachers are grouped by the room types their subjects allow (theory only,
+    practical only, or either); by Hall's theorem a set of teachers at one slot
+    can be seated iff the theory-only group fits in Theory+Both rooms, the
+    practical-only group fits in Practical+Both rooms, and everyone fits in
+    the total. Concrete rooms and subjects are handed out after the search.
+
+    Variables are picked by minimum remaining values (fewest viable slots
+    relative to lectures still needed), ties broken by degree (how many other
+    teachers compete for the same slots). When a slot fills up for a group,
+    every unfinished teacher of that group is re-checked and the branch is
+    abandoned as soon as one of them can no longer reach its demand.
+
+    Demand that exceeds the per-day supply bound is trimmed before searching.
+    If the node budget runs out before full coverage, the better of the
+    deepest partial assignment and a relaxed no-backtracking pass is kept and
+    topped up greedily.
+    """
+
+    name = 'csp'
+
+    def __init__(self, seed=None, max_nodes=None, **options):
+        # Per-day node budget; by default twice the day's demand, since a
+        # clean solve visits one node per lecture
+        self.max_nodes = max_nodes
+        self.stats = {}
+
+    def solve(self, problem, progress=None):
+        """Generate conflict-free assignments covering as much demand as possible"""
+        rooms_by_type = {THEORY: [], PRACTICAL: [], BOTH: []}
+        for room, room_type in enumerate(problem.room_types):
+            rooms_by_type[room_type].append(room)
+
+        assignments = []
+        self.stats = {'demand': 0, 'lectures_scheduled': 0, 'nodes': 0, 'complete_days': 0}
+
+        done = 0
+        for day in DAYS:
+            day_slots = problem.day_slots[day]
+            if not day_slots:
+                continue
+            if progress:
+                progress(done, problem.slot_count)
+            placed = self.solve_day(problem, day_slots, rooms_by_type)
+            assignments.extend(self.assign_rooms(problem, day_slots, placed, rooms_by_type))
+            done += len(day_slots)
+
+        demand = self.stats['demand']
+        self.stats['lectures_scheduled'] = len(assignments)
+        self.stats['coverage'] = round(len(assignments) / demand, 4) if demand else 1.0
+        return assignments
+
+    def solve_day(self, problem, day_slots, rooms_by_type):
+        """Return {teacher: [day position, ...]} for one day"""
+        m = len(day_slots)
+        # adjacent[i]: slot i+1 starts when slot i ends (no break in between)
+        adjacent = [
+            problem.slot_start[day_slots[i + 1]] <= problem.slot_end[day_slots[i]] for i in range(m - 1)
+        ] + [False]
+
+        n_theory = len(rooms_by_type[THEORY])
+        n_practical = len(rooms_by_type[PRACTICAL])
+        n_both = len(rooms_by_type[BOTH])
+        limit = {THEORY: n_theory + n_both, PRACTICAL: n_practical + n_both}
+
+        # One variable per teacher that can teach today
+        group, avail, demand, max_run = {}, {}, {}, {}
+        for t in range(problem.teacher_count):
+            types = {problem.subject_types[subject] for subject in problem.teacher_subjects[t]}
+            theory = THEORY in types and limit[THEORY] > 0
+            practical = PRACTICAL in types and limit[PRACTICAL] > 0
+            if not (theory or practical):
+                continue
+            mask = 0
+            for i, slot in enumerate(day_slots):
+                if problem.teacher_available(t, slot):
+                    mask |= 1 << i
+            run = problem.max_continuous[t] or m
+            wanted = min(problem.lectures_per_day[t], max_picks(mask, adjacent, run))
+            if wanted <= 0:
+                continue
+            group[t] = ANY if theory and practical else (THEORY if theory else PRACTICAL)
+            avail[t] = mask
+            demand[t] = wanted
+            max_run[t] = run
+
+        self.stats['demand'] += sum(demand.values())
+        if not demand:
+            return {}
+
+        search = DaySearch(adjacent, limit, n_theory + n_practical + n_both, group, avail, max_run)
+        leveled = search.level(demand)
+        search.reset(leveled)
+        budget = self.max_nodes or 2 * sum(leveled.values()) + 1000
+        complete, nodes, best = search.backtrack(budget)
+        self.stats['nodes'] += nodes
+        if complete:
+            self.stats['complete_days'] += 1
+            return best
+
+        # Budget exhausted or no full cover exists
+        search.reset(demand)
+        relaxed = search.relaxed()
+        if sum(map(len, relaxed.values())) > sum(map(len, best.values())):
+            best = relaxed
+        return search.top_up(best, demand)
+
+    def assign_rooms(self, problem, day_slots, placed, rooms_by_type):
+        """Turn {teacher: [day position, ...]} into concrete room/subject assignments"""
+        by_position = {}
+        for t in sorted(placed):
+            for position in placed[t]:
+                by_position.setdefault(position, []).append(t)
+
+        subject_use = {}
+        assignments = []
+        for position in sorted(by_position):
+            free = {room_type: list(rooms) for room_type, rooms in rooms_by_type.items()}
+            # Single-type teachers take the dedicated rooms before flexible ones
+            ordered = sorted(by_position[position], key=lambda t: (len(self._types(problem, t)) > 1, t))
+            for t in ordered:
+                types = self._types(problem, t)
+                pools = [room_type for room_type in (THEORY, PRACTICAL) if room_type in types] + [BOTH]
+                room = next((free[pool].pop(0) for pool in pools if free[pool]), None)
+                if room is None:
+                    continue
+                usable = [s for s in problem.teacher_subjects[t] if problem.room_suits(room, s)]
+                usage = subject_use.setdefault(t, {})
+                subject = min(usable, key=lambda s: usage.get(s, 0))
+                usage[subject] = usage.get(subject, 0) + 1
+                assignments.append((day_slots[position], t, subject, room))
+        return assignments
+
+    @staticmethod
+    def _types(problem, teacher):
+        return {problem.subject_types[subject] for subject in problem.teacher_subjects[teacher]}
+
+
+SOLVERS = {
+    GreedySolver.name: GreedySolver,
+    CSPSolver.name: CSPSolver,
+}
+
+
+def get_solver(engine='greedy', **options):
+    """Instantiate the solver engine registered under the given name"""
+    try:
+        solver_class = SOLVERS[engine]
+    except KeyError:
+        raise ValueError(f"Unknown generation engine '{engine}'. Choose one of: {', '.join(SOLVERS)}.")
+    return solver_class(**options)
@@ -0,0 +1,117 @@
+"""
+Sparse fieldsets for the REST API.
+
+``?fields=id,name`` limits a GET response to the named fields and
+``?expand=teacher,subject`` limits the nested objects a serializer embeds
+(everything listed in its ``Meta.expandable`` by default). SparseFieldsMixin
+then trims the view's queryset to match: unused select_related joins and
+prefetches are dropped and, where every field maps to a column, the SELECT
+is narrowed with only(). Fields nobody asked for are neither queried nor
+encoded.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.serializers import BaseSerializer
+
+
+def requested_fields(request):
+    """Return (fields, expand) from the query string; None when a parameter is absent"""
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+
+    def split(name):
+        if name not in params:
+            return None
+        return {part.strip() for part in params.get(name, '').split(',') if part.strip()}
+
+    return split('fields'), split('expand')
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin that drops fields per ?fields= and ?expand= on GET requests"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        fields, expand = requested_fields(request)
+        if expand is not None:
+            for name, field_name in getattr(self.Meta, 'expandable', {}).items():
+                if name not in expand and field_name not in (fields or ()):
+                    self.fields.pop(field_name, None)
+        if fields is not None:
+            for field_name in list(self.fields):
+                if field_name not in fields:
+                    self.fields.pop(field_name)
+
+
+def flatten_select_related(tree, prefix=''):
+    """Turn Query.select_related's nested dict back into lookup strings"""
+    lookups = []
+    for name, children in tree.items():
+        lookup = prefix + name
+        nested = flatten_select_related(children, lookup + '__')
+        lookups.extend(nested or [lookup])
+    return lookups
+
+
+class SparseFieldsMixin:
+    """ViewSet mixin that prunes joins, prefetches and columns to the serialized fields"""
+
+    sparse_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.sparse_actions:
+            queryset = self.prune_queryset(queryset)
+        return queryset
+
+    def prune_queryset(self, queryset):
+        serializer = self.get_serializer()
+        if hasattr(serializer, 'child'):
+            serializer = serializer.child
+
+        # Nested serializers need their related row; a primary key field only needs the column
+        sources, nested = set(), set()
+        opaque = False
+        for field in serializer.fields.values():
+            if field.source == '*':
+                opaque = True
+                continue
+            source = field.source.split('.')[0]
+            sources.add(source)
+            if isinstance(field, BaseSerializer) or '.' in field.source:
+                nested.add(source)
+
+        tree = queryset.query.select_related
+        if isinstance(tree, dict):
+            keep = [lookup for lookup in flatten_select_related(tree) if lookup.split('__')[0] in nested]
+            queryset = queryset.select_related(None)
+            if keep:
+                queryset = queryset.select_related(*keep)
+
+        # A many-related field of pks needs its own prefetch; a deeper path only helps a nested object
+        prefetches = queryset._prefetch_related_lookups
+        if prefetches:
+            keep = []
+            for lookup in prefetches:
+                root, _, rest = getattr(lookup, 'prefetch_to', lookup).partition('__')
+                if root in (nested if rest else sources):
+                    keep.append(lookup)
+            queryset = queryset.prefetch_related(None).prefetch_related(*keep)
+
+        # Narrow the SELECT only when every field is a column, relation or annotation
+        model = queryset.model
+        columns = {model._meta.pk.name, *getattr(serializer.Meta, 'required_columns', ())}
+        for source in sources:
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                if source not in queryset.query.annotations:
+                    opaque = True
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+        if not opaque:
+            queryset = queryset.only(*columns)
+        return queryset
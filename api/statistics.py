@@ -0,0 +1,147 @@
+"""
+Maintained row counts for the statistics endpoints.
+
+Instead of running COUNT(*) over every table on each request, counts live in
+DataCounter rows: one per table plus one per timetable for its entries. They
+are adjusted with F() updates in the same transaction as the change:
+
+- save and delete signals cover single rows (see signals.py). Deleting a
+  timetable, subject, teacher, classroom or time slot also subtracts the
+  entries that the delete cascades to. Entries themselves are subtracted
+  by TimetableEntry.delete() and the entry queryset's delete().
+- bulk writers pass their row deltas to adjust_counters(). Writers that
+  cannot tell inserts from updates call rebuild_counters() instead.
+
+read_statistics() then costs two small queries however large the tables are.
+
+The 'input_version' counter is bumped by every change to the generator's
+inputs (subjects, teachers and their subjects, classrooms, time slots).
+Generation solves against a snapshot and only writes if the version it read
+is still current, see claim_input_version().
+"""
+from django.db.models import Count, F
+
+from .active import active_timetable
+from .caching import DATA_VERSION_KEY
+from .models import DataCounter, Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable, TimetableEntry
+
+COUNTED_TABLES = [
+    ('subjects', Subject),
+    ('teachers', Teacher),
+    ('classrooms', Classroom),
+    ('time_slots', TimeSlot),
+    ('timetables', Timetable),
+    ('timetable_entries', TimetableEntry),
+]
+TABLE_KEYS = {model: key for key, model in COUNTED_TABLES}
+
+INPUT_VERSION_KEY = 'input_version'
+INPUT_MODELS = [Subject, Teacher, TeacherSubject, Classroom, TimeSlot]
+
+# TimetableEntry foreign keys whose targets cascade-delete entries
+CASCADE_FIELDS = {Subject: 'subject', Teacher: 'teacher', Classroom: 'classroom', TimeSlot: 'time_slot'}
+
+
+def entries_key(timetable_id):
+    return f'timetable:{timetable_id}:entries'
+
+
+def entry_deltas(timetable_counts, sign=1):
+    """Counter deltas for {timetable_id: entries} added (sign=1) or removed (sign=-1)"""
+    deltas = {entries_key(timetable_id): sign * count for timetable_id, count in timetable_counts.items()}
+    deltas['timetable_entries'] = sign * sum(timetable_counts.values())
+    return deltas
+
+
+def adjust_counters(deltas):
+    """Add {key: delta} to the counters, creating any that do not exist yet"""
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        if not DataCounter.objects.filter(key=key).update(value=F('value') + delta):
+            DataCounter.objects.create(key=key, value=delta)
+
+
+def entries_per_timetable(**filters):
+    """{timetable_id: entry count} for the entries matching filters"""
+    return count_per_timetable(TimetableEntry.objects.filter(**filters))
+
+
+def count_per_timetable(entries):
+    """{timetable_id: entry count} for an entry queryset"""
+    return dict(
+        entries.order_by().values('timetable_id').annotate(count=Count('id')).values_list('timetable_id', 'count')
+    )
+
+
+def rebuild_counters():
+    """Recount every table and timetable from scratch, keeping the version counters; returns the counts"""
+    counts = {key: model.objects.count() for key, model in COUNTED_TABLES}
+    counts.update({
+        entries_key(timetable_id): count for timetable_id, count in entries_per_timetable().items()
+    })
+    DataCounter.objects.exclude(key__in=[INPUT_VERSION_KEY, DATA_VERSION_KEY]).delete()
+    DataCounter.objects.bulk_create([DataCounter(key=key, value=value) for key, value in counts.items()])
+    return counts
+
+
+def input_version():
+    """Current version of the generator's input data"""
+    counter, _ = DataCounter.objects.get_or_create(key=INPUT_VERSION_KEY)
+    return counter.value
+
+
+def claim_input_version(version):
+    """
+    True if the inputs are still at version; call inside the write transaction.
+
+    The check is a no-op UPDATE, so it also takes the write lock: an input
+    change committed after it has to wait for the caller's transaction.
+    """
+    return bool(DataCounter.objects.filter(key=INPUT_VERSION_KEY, value=version).update(value=F('value')))
+
+
+def inputs_changed(**kwargs):
+    adjust_counters({INPUT_VERSION_KEY: 1})
+
+
+def read_statistics():
+    """Row count per table and the active timetable with its entry count"""
+    active = active_timetable()
+    if active:
+        active = {'id': active[0], 'name': active[1]}
+    keys = [key for key, _ in COUNTED_TABLES]
+    if active:
+        keys.append(entries_key(active['id']))
+    counters = dict(DataCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+
+    statistics = {key: counters.get(key, 0) for key, _ in COUNTED_TABLES}
+    if active:
+        active['entries_count'] = counters.get(entries_key(active['id']), 0)
+    statistics['active_timetable'] = active
+    return statistics
+
+
+def row_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    deltas = {TABLE_KEYS[sender]: 1}
+    if sender is TimetableEntry:
+        deltas[entries_key(instance.timetable_id)] = 1
+    adjust_counters(deltas)
+
+
+def collect_cascade(sender, instance, **kwargs):
+    """pre_delete: note the entries the delete will cascade to, before they are gone"""
+    instance._cascaded_entries = entries_per_timetable(**{CASCADE_FIELDS[sender]: instance.pk})
+
+
+def row_deleted(sender, instance, **kwargs):
+    deltas = {TABLE_KEYS[sender]: -1}
+    if sender is Timetable:
+        counter = DataCounter.objects.filter(key=entries_key(instance.pk))
+        deltas['timetable_entries'] = -(counter.values_list('value', flat=True).first() or 0)
+        counter.delete()
+    else:
+        deltas.update(entry_deltas(getattr(instance, '_cascaded_entries', {}), sign=-1))
+    adjust_counters(deltas)
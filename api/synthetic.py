@@ -0,0 +1,148 @@
+"""
+Synthetic institutions for load testing the timetable generator.
+
+build_institution() replaces all scheduling data (subjects, teachers,
+classrooms, time slots and timetables) with a reproducible, parametrized
+dataset written through bulk_create, so instances with thousands of rows can
+be created in a couple of seconds.
+"""
+import random
+from datetime import time
+
+from django.db import transaction
+
+from .caching import mark_data_changed
+from .models import Subject, Teacher, TeacherSubject, Classroom, TimeSlot, Timetable, TimetableEntry
+from .problem import DAYS
+from .statistics import INPUT_VERSION_KEY, adjust_counters, rebuild_counters
+
+DEFAULT_BREAKS = {2: 'short', 4: 'long'}
+BREAK_MINUTES = {'short': 15, 'long': 30}
+
+
+def parse_breaks(spec):
+    """
+    Parse a break pattern such as "2:short,4:long" into {2: 'short', 4: 'long'}.
+
+    Each item places a break after that many lectures of the day.
+    """
+    breaks = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        after, _, kind = item.partition(':')
+        kind = kind or 'short'
+        if kind not in BREAK_MINUTES:
+            raise ValueError(f"Unknown break type '{kind}'. Use 'short' or 'long'.")
+        breaks[int(after)] = kind
+    return breaks
+
+
+def as_time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def day_schedule(slots_per_day, day_start=8 * 60, lecture_minutes=60, breaks=None):
+    """Return [(start, end, break_type or None)] in minutes for one day"""
+    breaks = DEFAULT_BREAKS if breaks is None else breaks
+    schedule = []
+    start = day_start
+    for lecture in range(1, slots_per_day + 1):
+        schedule.append((start, start + lecture_minutes, None))
+        start += lecture_minutes
+        if lecture in breaks and lecture < slots_per_day:
+            length = BREAK_MINUTES[breaks[lecture]]
+            schedule.append((start, start + length, breaks[lecture]))
+            start += length
+    if start >= 24 * 60:
+        raise ValueError("The daily schedule does not fit in one day. Use fewer slots per day.")
+    return schedule
+
+
+def clear_institution():
+    """Delete all scheduling data, timetables first"""
+    TimetableEntry.objects.all().delete()
+    Timetable.objects.all().delete()
+    TeacherSubject.objects.all().delete()
+    Teacher.objects.all().delete()
+    Subject.objects.all().delete()
+    Classroom.objects.all().delete()
+    TimeSlot.objects.all().delete()
+
+
+@transaction.atomic
+def build_institution(teachers=30, subjects=20, rooms=15, slots_per_day=8, days=6, breaks=None,
+                      practical_ratio=0.3, subjects_per_teacher=2, wings='ABCD', seed=0):
+    """Replace all scheduling data with a synthetic institution; returns row counts"""
+    if not 1 <= days <= len(DAYS):
+        raise ValueError(f"Days must be between 1 and {len(DAYS)}.")
+    if teachers < 1 or subjects < 1 or rooms < 1 or slots_per_day < 1:
+        raise ValueError("Teachers, subjects, rooms and slots per day must all be positive.")
+    rnd = random.Random(seed)
+    schedule = day_schedule(slots_per_day, breaks=breaks)
+
+    clear_institution()
+
+    Subject.objects.bulk_create([
+        Subject(
+            code=f'SYN{i:04d}',
+            name=f'Synthetic Subject {i}',
+            type='Practical' if rnd.random() < practical_ratio else 'Theory',
+            credits=rnd.choice([2, 3, 4])
+        )
+        for i in range(subjects)
+    ])
+
+    # Practical labs and mixed rooms in roughly the same share as practical subjects
+    room_types = []
+    for _ in range(rooms):
+        roll = rnd.random()
+        room_types.append('Practical' if roll < practical_ratio else 'Both' if roll < practical_ratio + 0.1 else 'Theory')
+    Classroom.objects.bulk_create([
+        Classroom(number=f'SYN{i:04d}', wing=wings[i % len(wings)], capacity=rnd.choice([30, 40, 60]), type=room_type)
+        for i, room_type in enumerate(room_types)
+    ])
+
+    # Working hours start up to two hours late and end up to two hours early
+    first_start, last_start = schedule[0][0], schedule[-1][0]
+    hours = []
+    for _ in range(teachers):
+        start = first_start + 60 * rnd.randint(0, 2)
+        hours.append((start, max(start, last_start - 60 * rnd.randint(0, 2))))
+    Teacher.objects.bulk_create([
+        Teacher(
+            name=f'Synthetic Teacher {i}',
+            email=f'teacher{i}@synthetic.example',
+            start_time=as_time(start),
+            end_time=as_time(end),
+            lectures_per_day=rnd.randint(min(2, slots_per_day), min(6, slots_per_day)),
+            max_continuous_lectures=rnd.choice([2, 3])
+        )
+        for i, (start, end) in enumerate(hours)
+    ])
+
+    # Re-read ids; bulk_create does not return primary keys on every backend
+    subject_ids = list(Subject.objects.order_by('id').values_list('id', flat=True))
+    teacher_ids = list(Teacher.objects.order_by('id').values_list('id', flat=True))
+    links = [
+        TeacherSubject(teacher_id=teacher_id, subject_id=subject_id)
+        for teacher_id in teacher_ids
+        for subject_id in rnd.sample(subject_ids, min(subjects_per_teacher, len(subject_ids)))
+    ]
+    TeacherSubject.objects.bulk_create(links)
+
+    TimeSlot.objects.bulk_create([
+        TimeSlot(day=day, start_time=as_time(start), end_time=as_time(end),
+                 is_break=break_type is not None, break_type=break_type)
+        for day in DAYS[:days]
+        for start, end, break_type in schedule
+    ])
+    rebuild_counters()
+    adjust_counters({INPUT_VERSION_KEY: 1})
+    mark_data_changed()
+
+    return {
+        'subjects': subjects,
+        'teachers': teachers,
+        'teacher_subjects': len(links),
+        'classrooms': rooms,
+        'time_slots': days * len(schedule),
+    }
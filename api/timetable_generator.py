@@ -1,170 +1,198 @@
-import random
+import time
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
-from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry
+from .caching import mark_data_changed
+from .memo import cache_size, load_solution, solve_key, store_solution
+from .models import Timetable, TimetableEntry
+from .parallel import multi_start
+from .problem import load_problem
+from .solvers import get_solver
+from .statistics import adjust_counters, claim_input_version, entry_deltas, input_version
+from .validation import check_feasibility
+
+DEFAULT_BATCH_SIZE = 500
+# Snapshot-solve-commit rounds before giving up on inputs that keep changing
+DEFAULT_ATTEMPTS = 3
+
+
+class InputsChanged(Exception):
+    """Generator inputs kept changing while the timetable was being solved"""
+
 
 class TimetableGenerator:
     """Automatic conflict-free timetable generator"""
     
+    def __init__(self, engine='greedy', batch_size=None, seed=None, seeds=None, workers=None,
+                 progress=None, attempts=None, memoize=True, **solver_options):
+        self.engine = engine
+        # Optional progress(done, total) callback, see api.solvers
+        self.progress = progress
+        # More than one seed switches to parallel multi-start generation; a single one is just the seed
+        self.seeds = list(seeds) if seeds else []
+        if len(self.seeds) == 1 and seed is None:
+            seed, self.seeds = self.seeds[0], []
+        self.seed = seed
+        self.solver = get_solver(engine, seed=seed, **solver_options)
+        self.solver_options = solver_options
+        self.workers = workers
+        self.batch_size = batch_size or getattr(settings, 'TIMETABLE_BULK_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.attempts = attempts or getattr(settings, 'TIMETABLE_GENERATION_ATTEMPTS', DEFAULT_ATTEMPTS)
+        # memoize=False bypasses the solve cache for seeded solves, e.g. when timing the solver
+        self.memoize = memoize
+        self.pending_entries = []
+        self.stats = {}
+    
     def generate_timetable(self, name):
-        """Generate complete conflict-free timetable"""
-        # Get all data from database (user input)
-        teachers = list(Teacher.objects.all().prefetch_related('subjects'))
-        subjects = list(Subject.objects.all())
-        classrooms = list(Classroom.objects.all())
-        timeslots = list(TimeSlot.objects.filter(is_break=False).order_by('day', 'start_time'))
-        break_slots = list(TimeSlot.objects.filter(is_break=True).order_by('day', 'start_time'))
-        
-        # Validate data
-        self.validate_data(teachers, subjects, classrooms, timeslots)
+        """
+        Generate complete conflict-free timetable and make it the active one.
+
+        Reading and solving run with no transaction open. Only the final write
+        holds the database lock, and it is skipped if the inputs changed since
+        they were read; the generator then starts over, up to self.attempts times.
+        """
+        for attempt in range(1, self.attempts + 1):
+            self.pending_entries = []
+            self.stats = {'attempts': attempt}
+            
+            # Get all data from database (user input) as a compact ORM-free problem
+            started = time.perf_counter()
+            version = input_version()
+            problem = load_problem()
+            self.stats['load_time'] = round(time.perf_counter() - started, 4)
+            if input_version() != version:
+                # Changed while loading; the snapshot may be torn
+                continue
+            
+            # Validate data
+            started = time.perf_counter()
+            self.validate_data(problem)
+            self.stats['validate_time'] = round(time.perf_counter() - started, 4)
+            
+            # Entries reference an unsaved timetable until the persistence stage
+            timetable = Timetable(name=name, is_active=True)
+            
+            # Generate entries in memory
+            started = time.perf_counter()
+            self.generate_entries(timetable, problem)
+            self.stats['solve_time'] = round(time.perf_counter() - started, 4)
+            
+            # Write the timetable and all of its entries in batches
+            if self.persist_entries(timetable, version):
+                return timetable
         
-        # Create new timetable
-        timetable = Timetable.objects.create(
-            name=name,
-            is_active=True
+        raise InputsChanged(
+            f"Subjects, teachers, classrooms or time slots changed during each of {self.attempts} "
+            f"generation attempts. Please try again."
         )
+    
+    def add_entry(self, timetable, day, time_slot_id, subject_id=None, teacher_id=None, classroom_id=None, is_break=False):
+        """Queue a timetable entry for the bulk persistence stage"""
+        self.pending_entries.append(TimetableEntry(
+            timetable=timetable,
+            day=day,
+            time_slot_id=time_slot_id,
+            subject_id=subject_id,
+            teacher_id=teacher_id,
+            classroom_id=classroom_id,
+            is_break=is_break
+        ))
+    
+    def persist_entries(self, timetable, version):
+        """
+        Write the timetable and queued entries with batched bulk_create, replacing the
+        active timetable. Returns False, writing nothing, if the inputs are past version.
+        """
+        started = time.perf_counter()
+        with transaction.atomic():
+            if not claim_input_version(version):
+                return False
+            # Saving the active timetable deactivates the previous one
+            timetable.save()
+            TimetableEntry.objects.bulk_create(self.pending_entries, batch_size=self.batch_size)
+            adjust_counters(entry_deltas({timetable.pk: len(self.pending_entries)}))
+            mark_data_changed()
         
-        # Generate entries
-        self.generate_entries(timetable, teachers, subjects, classrooms, timeslots, break_slots)
-        
-        return timetable
+        self.stats['rows_written'] = len(self.pending_entries)
+        self.stats['batch_size'] = self.batch_size
+        self.stats['write_time'] = round(time.perf_counter() - started, 4)
+        self.pending_entries = []
+        return True
     
-    def validate_data(self, teachers, subjects, classrooms, timeslots):
+    def validate_data(self, problem):
         """Validate that we have enough data to generate timetable"""
-        if not teachers:
-            raise ValueError("No teachers found. Please add teachers first.")
-        if not subjects:
-            raise ValueError("No subjects found. Please add subjects first.")
-        if not classrooms:
-            raise ValueError("No classrooms found. Please add classrooms first.")
-        if not timeslots:
-            raise ValueError("No time slots found. Please add time slots first.")
+        report = check_feasibility(problem)
+        if report.errors:
+            raise ValueError(report.errors[0])
+        self.stats['feasibility'] = report.bounds
+    
+    def memo_key(self, problem):
+        """Cache key for a seeded, and so repeatable, solve of problem; None if unseeded or not memoized"""
+        if not self.memoize or not cache_size() or (self.seed is None and len(self.seeds) < 2):
+            return None
+        return solve_key(problem, {
+            'engine': self.solver.name,
+            'seed': self.seed,
+            'seeds': self.seeds if len(self.seeds) > 1 else [],
+            'options': self.solver_options,
+        })
+    
+    def solve(self, problem):
+        """Solve lecture slots with the selected engine; seeded solves are memoized by problem content"""
+        key = self.memo_key(problem)
+        if key:
+            cached = load_solution(key)
+            if cached is not None:
+                assignments, stats = cached
+                self.stats.update(stats, memo_hit=True)
+                return assignments
         
-        # Check if teachers have subjects assigned
-        for teacher in teachers:
-            if not teacher.subjects.exists():
-                raise ValueError(f"Teacher {teacher.name} has no subjects assigned.")
+        assignments, solve_stats = self.run_solver(problem)
+        self.stats.update(solve_stats)
+        if key:
+            store_solution(key, self.solver.name, assignments, solve_stats)
+            self.stats['memo_hit'] = False
+        return assignments
+    
+    def run_solver(self, problem):
+        """Solve without touching the database; returns (assignments, solver stats)"""
+        stats = {}
+        if len(self.seeds) > 1:
+            best, runs = multi_start(
+                problem, self.engine, self.seeds, self.workers, self.solver_options, self.progress
+            )
+            stats.update(best['solver_stats'])
+            stats['best_seed'] = best['seed']
+            stats['runs'] = runs
+            assignments = best['assignments']
+        else:
+            assignments = self.solver.solve(problem, self.progress)
+            stats.update(self.solver.stats)
+        stats['engine'] = self.solver.name
+        return assignments, stats
     
-    def generate_entries(self, timetable, teachers, subjects, classrooms, timeslots, break_slots):
+    def generate_entries(self, timetable, problem):
         """Generate conflict-free timetable entries"""
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        
-        # Track assignments to avoid conflicts
-        teacher_assignments = {teacher.id: set() for teacher in teachers}
-        classroom_assignments = {classroom.id: set() for classroom in classrooms}
-        teacher_daily_count = {teacher.id: {day: 0 for day in days} for teacher in teachers}
-        
         # Add break entries first
-        self.add_break_entries(timetable, break_slots)
+        self.add_break_entries(timetable, problem)
         
-        # Generate regular entries for each day
-        for day in days:
-            day_timeslots = [ts for ts in timeslots if ts.day == day]
-            self.generate_day_schedule(
-                timetable, day, day_timeslots, teachers, subjects, classrooms,
-                teacher_assignments, classroom_assignments, teacher_daily_count
+        for slot, teacher, subject, room in self.solve(problem):
+            self.add_entry(
+                timetable,
+                day=problem.slot_days[slot],
+                time_slot_id=problem.slot_ids[slot],
+                subject_id=problem.subject_ids[subject],
+                teacher_id=problem.teacher_ids[teacher],
+                classroom_id=problem.room_ids[room]
             )
     
-    def add_break_entries(self, timetable, break_slots):
+    def add_break_entries(self, timetable, problem):
         """Add break time entries to timetable - breaks don't need subject, teacher, or classroom"""
-        for break_slot in break_slots:
-            TimetableEntry.objects.create(
-                timetable=timetable,
-                day=break_slot.day,
-                time_slot=break_slot,
+        for time_slot_id, day in zip(problem.break_slot_ids, problem.break_slot_days):
+            self.add_entry(
+                timetable,
+                day=day,
+                time_slot_id=time_slot_id,
                 is_break=True
                 # subject, teacher, and classroom are NULL for breaks
             )
-    
-    def generate_day_schedule(self, timetable, day, day_timeslots, teachers, subjects, 
-                            classrooms, teacher_assignments, classroom_assignments, teacher_daily_count):
-        """Generate schedule for a single day"""
-        
-        for timeslot in day_timeslots:
-            # Find available teachers for this timeslot
-            available_teachers = self.get_available_teachers(
-                teachers, timeslot, day, teacher_assignments, teacher_daily_count
-            )
-            
-            # Shuffle for random assignment
-            random.shuffle(available_teachers)
-            
-            assigned = False
-            for teacher in available_teachers:
-                # Get teacher's subjects
-                teacher_subjects = list(teacher.subjects.all())
-                if not teacher_subjects:
-                    continue
-                
-                # Find available classroom
-                available_classroom = self.get_available_classroom(
-                    classrooms, timeslot, day, classroom_assignments
-                )
-                if not available_classroom:
-                    continue
-                
-                # Select random subject from teacher's subjects
-                subject = random.choice(teacher_subjects)
-                
-                # Check classroom suitability
-                if not self.is_classroom_suitable(available_classroom, subject):
-                    continue
-                
-                # Create timetable entry
-                TimetableEntry.objects.create(
-                    timetable=timetable,
-                    day=day,
-                    time_slot=timeslot,
-                    subject=subject,
-                    teacher=teacher,
-                    classroom=available_classroom,
-                    is_break=False
-                )
-                
-                # Update tracking
-                slot_key = f"{day}-{timeslot.id}"
-                teacher_assignments[teacher.id].add(slot_key)
-                classroom_assignments[available_classroom.id].add(slot_key)
-                teacher_daily_count[teacher.id][day] += 1
-                
-                assigned = True
-                break
-    
-    def get_available_teachers(self, teachers, timeslot, day, teacher_assignments, teacher_daily_count):
-        """Get teachers available for the given timeslot"""
-        available = []
-        
-        for teacher in teachers:
-            # Check time availability
-            if not (teacher.start_time <= timeslot.start_time <= teacher.end_time):
-                continue
-            
-            # Check daily lecture limit
-            if teacher_daily_count[teacher.id][day] >= teacher.lectures_per_day:
-                continue
-            
-            # Check if already assigned in this timeslot
-            slot_key = f"{day}-{timeslot.id}"
-            if slot_key in teacher_assignments[teacher.id]:
-                continue
-            
-            available.append(teacher)
-        
-        return available
-    
-    def get_available_classroom(self, classrooms, timeslot, day, classroom_assignments):
-        """Get available classroom for the given timeslot"""
-        available_classrooms = []
-        
-        for classroom in classrooms:
-            slot_key = f"{day}-{timeslot.id}"
-            if slot_key not in classroom_assignments[classroom.id]:
-                available_classrooms.append(classroom)
-        
-        return random.choice(available_classrooms) if available_classrooms else None
-    
-    def is_classroom_suitable(self, classroom, subject):
-        """Check if classroom is suitable for the subject"""
-        if classroom.type == 'Both':
-            return True
-        return classroom.type == subject.type
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import metrics, views
 
 router = DefaultRouter()
 router.register(r'subjects', views.SubjectViewSet)
@@ -9,6 +9,7 @@ router.register(r'classrooms', views.ClassroomViewSet)
 router.register(r'timeslots', views.TimeSlotViewSet)
 router.register(r'timetables', views.TimetableViewSet)
 router.register(r'timetable-entries', views.TimetableEntryViewSet)
+router.register(r'generation-jobs', views.GenerationJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -18,4 +19,5 @@ urlpatterns = [
     path('get-all-data/', views.get_all_data, name='api-get-all'),
     path('export-json/', views.export_data_json, name='api-export-json'),
     path('import-json/', views.import_data_json, name='api-import-json'),
+    path('metrics/', metrics.metrics_view, name='api-metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Feasibility analysis for timetable generation.
+
+check_feasibility() works on a ProblemInstance, so the whole analysis costs
+the five queries of load_problem() however many rows there are. Besides the
+basic "is there any data" checks it computes bounds before anything is
+solved:
+
+- each teacher's available lecture slots per day against lectures_per_day
+- lecture demand against room supply per room type (a max-flow bound over
+  Theory, Practical and Both rooms)
+- a Hall's-condition check that the subjects can be covered by distinct
+  teachers
+
+Problems where no lecture can be placed at all are reported as errors so
+they are rejected before solving.
+"""
+from .matching import hopcroft_karp
+from .occupancy import OccupancyGrid
+from .problem import DAYS, PRACTICAL, THEORY
+
+# Teacher groups by the rooms their subjects can use
+ANY = 'Any'
+GROUP_NAMES = {THEORY: 'Theory', PRACTICAL: 'Practical', ANY: 'Any'}
+
+
+class FeasibilityReport:
+    """Errors, warnings and bounds from check_feasibility"""
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.bounds = {}
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def as_dict(self):
+        return {
+            'valid': self.valid,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'bounds': self.bounds,
+        }
+
+
+def check_feasibility(problem):
+    """Analyze a ProblemInstance and return a FeasibilityReport"""
+    report = FeasibilityReport()
+
+    if not problem.teacher_count:
+        report.errors.append("No teachers found. Please add teachers first.")
+    if not problem.subject_count:
+        report.errors.append("No subjects found. Please add subjects first.")
+    if not problem.room_count:
+        report.errors.append("No classrooms found. Please add classrooms first.")
+    if not problem.slot_count:
+        report.errors.append("No time slots found. Please add time slots first.")
+    for teacher, subjects in enumerate(problem.teacher_subjects):
+        if not subjects:
+            report.errors.append(f"Teacher {problem.teacher_names[teacher]} has no subjects assigned.")
+    if report.errors:
+        return report
+
+    grid = OccupancyGrid(problem)
+    check_subject_rooms(problem, grid, report)
+    groups = teacher_groups(problem, grid)
+    demand = check_teacher_hours(problem, grid, groups, report)
+    check_room_supply(problem, grid, demand, report)
+    check_subject_coverage(problem, report)
+
+    if not report.bounds['max_lectures']:
+        report.errors.append(
+            "No lecture can be scheduled: no teacher is free during any lecture slot "
+            "with a classroom that suits one of their subjects."
+        )
+    return report
+
+
+def check_subject_rooms(problem, grid, report):
+    """Warn about subjects no classroom suits"""
+    for subject, subject_type in enumerate(problem.subject_types):
+        if not grid.room_type_mask.get(subject_type):
+            report.warnings.append(
+                f"No suitable classrooms found for {GROUP_NAMES[subject_type]} subject "
+                f"'{problem.subject_names[subject]}'"
+            )
+
+
+def teacher_groups(problem, grid):
+    """Room group per teacher: THEORY, PRACTICAL, ANY, or None if no room suits them"""
+    groups = []
+    for teacher, subjects in enumerate(problem.teacher_subjects):
+        types = {problem.subject_types[s] for s in subjects if grid.room_type_mask.get(problem.subject_types[s])}
+        groups.append(None if not types else types.pop() if len(types) == 1 else ANY)
+    return groups
+
+
+def check_teacher_hours(problem, grid, groups, report):
+    """Warn about teachers who cannot reach lectures_per_day; returns demand[day][group]"""
+    demand = {day: {THEORY: 0, PRACTICAL: 0, ANY: 0} for day in DAYS}
+    for teacher in range(problem.teacher_count):
+        bit = 1 << teacher
+        name = problem.teacher_names[teacher]
+        if groups[teacher] is None:
+            report.warnings.append(f"Teacher '{name}' has no subject that any classroom suits")
+            continue
+
+        available = {
+            day: sum(1 for slot in slots if grid.teacher_available[slot] & bit)
+            for day, slots in problem.day_slots.items() if slots
+        }
+        if not any(available.values()):
+            report.warnings.append(f"Teacher '{name}' has no available timeslots within their working hours")
+            continue
+        most = max(available.values())
+        if most < problem.lectures_per_day[teacher]:
+            report.warnings.append(
+                f"Teacher '{name}' can teach at most {most} of their {problem.lectures_per_day[teacher]} "
+                f"lectures per day within their working hours"
+            )
+        for day, count in available.items():
+            demand[day][groups[teacher]] += min(count, problem.lectures_per_day[teacher])
+    return demand
+
+
+def check_room_supply(problem, grid, demand, report):
+    """Bound the lectures per week by room supply per room type (max-flow / min-cut)"""
+    rooms = {
+        THEORY: grid.room_type_mask[THEORY],
+        PRACTICAL: grid.room_type_mask[PRACTICAL],
+        ANY: grid.all_rooms,
+    }
+    weekly_demand = {THEORY: 0, PRACTICAL: 0, ANY: 0}
+    weekly_supply = {THEORY: 0, PRACTICAL: 0, ANY: 0}
+    max_lectures = 0
+    for day, slots in problem.day_slots.items():
+        if not slots:
+            continue
+        # Lectures in one slot are also capped by the teachers free in it
+        slot_cap = sum(
+            min(grid.teacher_available[slot].bit_count(), problem.room_count) for slot in slots
+        )
+        # Min cut: for each set of groups, their reachable rooms cap them; the rest cap themselves
+        best = None
+        for chosen in range(8):
+            members = [group for i, group in enumerate((THEORY, PRACTICAL, ANY)) if chosen >> i & 1]
+            reachable = 0
+            for group in members:
+                reachable |= rooms[group]
+            cut = reachable.bit_count() * len(slots)
+            cut += sum(need for group, need in demand[day].items() if group not in members)
+            best = cut if best is None else min(best, cut)
+        max_lectures += min(best, slot_cap)
+
+        for group in weekly_demand:
+            weekly_demand[group] += demand[day][group]
+            weekly_supply[group] += rooms[group].bit_count() * len(slots)
+
+    for group in (THEORY, PRACTICAL):
+        if weekly_demand[group] > weekly_supply[group]:
+            report.warnings.append(
+                f"{GROUP_NAMES[group]}-only teachers can give up to {weekly_demand[group]} lectures a week "
+                f"but suitable classrooms offer only {weekly_supply[group]} room-slots"
+            )
+    total_demand = sum(weekly_demand.values())
+    report.bounds['demand'] = total_demand
+    report.bounds['room_slots'] = weekly_supply[ANY]
+    report.bounds['max_lectures'] = max_lectures
+    if total_demand > max_lectures:
+        report.warnings.append(
+            f"Teachers want up to {total_demand} lectures a week but at most {max_lectures} can be scheduled"
+        )
+
+
+def check_subject_coverage(problem, report):
+    """Hall's condition: can every subject be taught by a distinct teacher"""
+    teachers_of = {subject: [] for subject in range(problem.subject_count)}
+    for teacher, subjects in enumerate(problem.teacher_subjects):
+        for subject in subjects:
+            teachers_of[subject].append(teacher)
+
+    uncovered = [problem.subject_names[s] for s, teachers in teachers_of.items() if not teachers]
+    if uncovered:
+        report.warnings.append(f"No teacher is assigned to: {', '.join(uncovered)}")
+
+    coverable = [s for s, teachers in teachers_of.items() if teachers]
+    matched = len(hopcroft_karp(coverable, teachers_of))
+    report.bounds['subjects_coverable'] = matched
+    if matched < len(coverable):
+        report.warnings.append(
+            f"Only {matched} of {len(coverable)} taught subjects can be covered by distinct teachers; "
+            f"some subjects share too few teachers"
+        )
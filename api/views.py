@@ -1,29 +1,91 @@
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, mixins, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Prefetch, Q
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.urls import reverse
 from django.contrib import messages
-import json
+import logging
 
-from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry
+from .models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry, GenerationJob
 from .serializers import (
     SubjectSerializer, TeacherSerializer, ClassroomSerializer,
-    TimeSlotSerializer, TimetableSerializer, TimetableEntrySerializer
+    TimeSlotSerializer, TimetableSerializer, TimetableSummarySerializer,
+    TimetableEntrySerializer, TimetableEntryIdSerializer, GenerationJobSerializer, normalize_entries
 )
-from .timetable_generator import TimetableGenerator
+from .timetable_generator import InputsChanged
+from .active import activate_timetable, active_timetable_id
+from .caching import CachedReadMixin, cached_response
+from .coordinator import get_coordinator
+from .exporters import csv_response, data_export_response, export_queryset, json_stream_response, keyset_batches
+from .filters import entry_filters, id_param
+from .importers import import_data
+from .jobs import submit_job, cancel_job, fail_orphaned_jobs
+from .repair import TimetableRepairer, repair_active_timetable
+from .pagination import EntryCursorPagination
+from .problem import load_problem
+from .sparse import SparseFieldsMixin
+from .statistics import read_statistics, rebuild_counters
+from .validation import check_feasibility
 from .forms import SubjectForm, TeacherForm, ClassroomForm, TimeSlotForm, TimetableForm
 
 
+logger = logging.getLogger(__name__)
+
+
 # ============================================
 # Model ViewSets for REST API
 # ============================================
 
-class SubjectViewSet(viewsets.ModelViewSet):
+def wants_normalized(request):
+    """?normalized=true asks for entries with side-loaded related objects"""
+    return request.query_params.get('normalized', '').lower() in ('1', 'true', 'yes')
+
+
+def with_entry_counts(timetables):
+    """Annotate the counts TimetableSummarySerializer reports"""
+    return timetables.annotate(
+        entry_count=Count('entries'),
+        lecture_count=Count('entries', filter=Q(entries__is_break=False)),
+        break_count=Count('entries', filter=Q(entries__is_break=True))
+    )
+
+
+def log_entry(action, entry):
+    """Log an entry write by ids, so it costs no queries for related rows"""
+    logger.info('timetable_entry %s id=%s timetable=%s day=%s time_slot=%s subject=%s teacher=%s classroom=%s break=%s',
+                action, entry.pk, entry.timetable_id, entry.day, entry.time_slot_id, entry.subject_id,
+                entry.teacher_id, entry.classroom_id, entry.is_break)
+
+
+def generation_options(data):
+    """
+    Read generator options from request data.
+    "seed" makes a single solve repeatable; "seeds" may be a count or a list
+    of seeds for multi-start generation. The result is JSON-serializable
+    so it can also be stored on a GenerationJob.
+    """
+    options = {'engine': data.get('engine', 'greedy')}
+    if data.get('batch_size'):
+        options['batch_size'] = int(data.get('batch_size'))
+    if data.get('seed') not in (None, ''):
+        options['seed'] = int(data.get('seed'))
+    seeds = data.get('seeds')
+    if isinstance(seeds, (int, str)):
+        seeds = range(int(seeds))
+    if seeds:
+        options['seeds'] = [int(seed) for seed in seeds]
+    if data.get('workers'):
+        options['workers'] = int(data.get('workers'))
+    return options
+
+
+class SubjectViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing subjects.
     Data will be saved to database and persist across server restarts.
@@ -35,45 +97,45 @@ class SubjectViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Save subject to database"""
         serializer.save()
-        print(f"Subject '{serializer.instance.name}' saved to database.")
+        logger.info('subject created id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_update(self, serializer):
         """Update subject in database"""
         serializer.save()
-        print(f"Subject '{serializer.instance.name}' updated in database.")
+        logger.info('subject updated id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_destroy(self, instance):
         """Delete subject from database"""
-        print(f"Subject '{instance.name}' deleted from database.")
+        logger.info('subject deleted id=%s name=%r', instance.pk, instance.name)
         instance.delete()
 
 
-class TeacherViewSet(viewsets.ModelViewSet):
+class TeacherViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing teachers.
     Data will be saved to database and persist across server restarts.
     """
-    queryset = Teacher.objects.all().order_by('name')
+    queryset = Teacher.objects.all().prefetch_related('subjects').order_by('name')
     serializer_class = TeacherSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def perform_create(self, serializer):
         """Save teacher to database"""
         serializer.save()
-        print(f"Teacher '{serializer.instance.name}' saved to database.")
+        logger.info('teacher created id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_update(self, serializer):
         """Update teacher in database"""
         serializer.save()
-        print(f"Teacher '{serializer.instance.name}' updated in database.")
+        logger.info('teacher updated id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_destroy(self, instance):
         """Delete teacher from database"""
-        print(f"Teacher '{instance.name}' deleted from database.")
+        logger.info('teacher deleted id=%s name=%r', instance.pk, instance.name)
         instance.delete()
 
 
-class ClassroomViewSet(viewsets.ModelViewSet):
+class ClassroomViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing classrooms.
     Data will be saved to database and persist across server restarts.
@@ -85,20 +147,20 @@ class ClassroomViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Save classroom to database"""
         serializer.save()
-        print(f"Classroom '{serializer.instance.number}' saved to database.")
+        logger.info('classroom created id=%s number=%r', serializer.instance.pk, serializer.instance.number)
 
     def perform_update(self, serializer):
         """Update classroom in database"""
         serializer.save()
-        print(f"Classroom '{serializer.instance.number}' updated in database.")
+        logger.info('classroom updated id=%s number=%r', serializer.instance.pk, serializer.instance.number)
 
     def perform_destroy(self, instance):
         """Delete classroom from database"""
-        print(f"Classroom '{instance.number}' deleted from database.")
+        logger.info('classroom deleted id=%s number=%r', instance.pk, instance.number)
         instance.delete()
 
 
-class TimeSlotViewSet(viewsets.ModelViewSet):
+class TimeSlotViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing time slots.
     Data will be saved to database and persist across server restarts.
@@ -110,20 +172,20 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Save time slot to database"""
         serializer.save()
-        print(f"TimeSlot '{serializer.instance.day} {serializer.instance.start_time}-{serializer.instance.end_time}' saved to database.")
+        logger.info('time_slot created id=%s slot="%s"', serializer.instance.pk, serializer.instance)
 
     def perform_update(self, serializer):
         """Update time slot in database"""
         serializer.save()
-        print(f"TimeSlot '{serializer.instance.day} {serializer.instance.start_time}-{serializer.instance.end_time}' updated in database.")
+        logger.info('time_slot updated id=%s slot="%s"', serializer.instance.pk, serializer.instance)
 
     def perform_destroy(self, instance):
         """Delete time slot from database"""
-        print(f"TimeSlot '{instance.day} {instance.start_time}-{instance.end_time}' deleted from database.")
+        logger.info('time_slot deleted id=%s slot="%s"', instance.pk, instance)
         instance.delete()
 
 
-class TimetableViewSet(viewsets.ModelViewSet):
+class TimetableViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing timetables.
     Data will be saved to database and persist across server restarts.
@@ -132,19 +194,40 @@ class TimetableViewSet(viewsets.ModelViewSet):
     serializer_class = TimetableSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def expand_entries(self):
+        """The list is a summary unless the client asks for ?expand=entries"""
+        return self.action != 'list' or 'entries' in self.request.query_params.get('expand', '').split(',')
+
+    def get_queryset(self):
+        """Annotate counts for the summary list, prefetch entries in one query otherwise"""
+        queryset = super().get_queryset()
+        if not self.expand_entries():
+            return with_entry_counts(queryset)
+        if self.action in ('list', 'retrieve', 'active', 'generate'):
+            entries = TimetableEntry.objects.select_related(
+                'subject', 'teacher', 'classroom', 'time_slot'
+            ).prefetch_related('teacher__subjects')
+            return queryset.prefetch_related(Prefetch('entries', queryset=entries))
+        return queryset
+
+    def get_serializer_class(self):
+        if not self.expand_entries():
+            return TimetableSummarySerializer
+        return TimetableSerializer
+
     def perform_create(self, serializer):
         """Save timetable to database"""
         serializer.save()
-        print(f"Timetable '{serializer.instance.name}' saved to database with ID {serializer.instance.id}.")
+        logger.info('timetable created id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_update(self, serializer):
         """Update timetable in database"""
         serializer.save()
-        print(f"Timetable '{serializer.instance.name}' updated in database.")
+        logger.info('timetable updated id=%s name=%r', serializer.instance.pk, serializer.instance.name)
 
     def perform_destroy(self, instance):
         """Delete timetable from database"""
-        print(f"Timetable '{instance.name}' deleted from database.")
+        logger.info('timetable deleted id=%s name=%r', instance.pk, instance.name)
         instance.delete()
     
     @action(detail=False, methods=['post'])
@@ -152,10 +235,19 @@ class TimetableViewSet(viewsets.ModelViewSet):
         """
         Generate a new timetable automatically.
         POST to /api/timetables/generate/ with JSON: {"name": "Timetable Name"}
+        Optional: "engine" selects the solver ("greedy" or "csp"),
+        "batch_size" controls how many entries are written per INSERT,
+        "seed" makes the solve repeatable, so a rerun reuses the stored result.
+        Multi-start: "seeds" (a count or a list of seeds) runs that many
+        independently seeded solves on "workers" processes and keeps the best.
+        With "async": true the request returns 202 and a generation job to poll
+        at /api/generation-jobs/<id>/.
         """
         name = request.data.get('name', 'Auto-generated Timetable')
         
         try:
+            options = generation_options(request.data)
+            
             # Check if we have enough data
             if Subject.objects.count() == 0:
                 return Response(
@@ -178,23 +270,25 @@ class TimetableViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            with transaction.atomic():
-                # Deactivate all previous timetables
-                Timetable.objects.filter(is_active=True).update(is_active=False)
-                
-                # Generate new timetable
-                generator = TimetableGenerator()
-                timetable = generator.generate_timetable(name)
-                
-                # Activate the new timetable
-                timetable.is_active = True
-                timetable.save()
-                
-                print(f"Generated timetable '{timetable.name}' with {timetable.entries.count()} entries.")
-                
-                serializer = self.get_serializer(timetable)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-                
+            if request.data.get('async'):
+                job = submit_job(name, options)
+                return Response(GenerationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+            
+            # Generate the new timetable, or share an identical solve already running;
+            # it replaces the active one in a short final transaction
+            timetable, stats = get_coordinator().generate(name, options)
+            
+            logger.info('timetable generated id=%s name=%r rows=%s write_time=%s shared=%s',
+                        timetable.pk, timetable.name, stats['rows_written'], stats['write_time'], stats['shared'])
+            
+            # Re-read with the entries prefetched, so serializing them does not query per entry
+            serializer = self.get_serializer(self.get_queryset().get(pk=timetable.pk))
+            data = serializer.data
+            data['generation_stats'] = stats
+            return Response(data, status=status.HTTP_201_CREATED)
+        
+        except InputsChanged as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response(
                 {'error': f'Timetable generation failed: {str(e)}'},
@@ -203,18 +297,31 @@ class TimetableViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def entries(self, request, pk=None):
-        """Get all entries for a specific timetable"""
+        """
+        Get all entries for a specific timetable.
+        ?normalized=true returns {"entries": [...], "subjects": {...}, "teachers": {...},
+        "classrooms": {...}, "time_slots": {...}} with each related object listed once.
+        """
+        return cached_response(request, self.entries_response)
+
+    def entries_response(self):
         timetable = self.get_object()
         entries = timetable.entries.all().select_related(
             'subject', 'teacher', 'classroom', 'time_slot'
-        )
+        ).prefetch_related('teacher__subjects')
+        if wants_normalized(self.request):
+            return Response(normalize_entries(list(entries)))
         serializer = TimetableEntrySerializer(entries, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get the currently active timetable"""
-        active_timetable = Timetable.objects.filter(is_active=True).first()
+        return cached_response(request, self.active_response)
+
+    def active_response(self):
+        active_id = active_timetable_id()
+        active_timetable = self.get_queryset().filter(pk=active_id).first() if active_id else None
         if active_timetable:
             serializer = self.get_serializer(active_timetable)
             return Response(serializer.data)
@@ -222,113 +329,200 @@ class TimetableViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def export_csv(self, request, pk=None):
-        """Export timetable as CSV"""
+        """
+        Export timetable as CSV, streamed row by row.
+        Optional: "teachers" and "classrooms" (comma-separated ids) export only those slices.
+        """
         timetable = self.get_object()
-        entries = timetable.entries.all().select_related(
-            'subject', 'teacher', 'classroom', 'time_slot'
-        ).order_by('time_slot__day', 'time_slot__start_time')
-        
-        import csv
-        from django.http import HttpResponse
+        try:
+            teacher_ids = id_param(request.query_params, 'teachers')
+            classroom_ids = id_param(request.query_params, 'classrooms')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{timetable.name}.csv"'
+        queryset = export_queryset([timetable.id], teacher_ids, classroom_ids)
+        return csv_response(queryset, timetable.name)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_many(self, request):
+        """
+        Export several timetables as one CSV in a single pass.
+        GET /api/timetables/export/?timetables=1,2 (default: the active timetable),
+        optionally sliced with "teachers" and "classrooms".
+        """
+        try:
+            timetable_ids = id_param(request.query_params, 'timetables')
+            teacher_ids = id_param(request.query_params, 'teachers')
+            classroom_ids = id_param(request.query_params, 'classrooms')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        writer = csv.writer(response)
-        writer.writerow(['Day', 'Start Time', 'End Time', 'Subject', 'Teacher', 'Classroom', 'Type'])
+        if not timetable_ids:
+            active_id = active_timetable_id()
+            timetable_ids = [active_id] if active_id else []
+        if not timetable_ids:
+            return Response({'detail': 'No active timetable found.'}, status=status.HTTP_404_NOT_FOUND)
         
-        for entry in entries:
-            writer.writerow([
-                entry.time_slot.day,
-                entry.time_slot.start_time,
-                entry.time_slot.end_time,
-                entry.subject.name,
-                entry.teacher.name,
-                entry.classroom.number,
-                'Break' if entry.time_slot.is_break else 'Class'
-            ])
-            
-        return response
+        queryset = export_queryset(timetable_ids, teacher_ids, classroom_ids)
+        return csv_response(queryset, 'timetables', include_timetable=True)
 
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
         """Activate a specific timetable"""
-        timetable = self.get_object()
+        timetable = activate_timetable(self.get_object())
         
-        with transaction.atomic():
-            # Deactivate all timetables
-            Timetable.objects.filter(is_active=True).update(is_active=False)
-            # Activate this timetable
-            timetable.is_active = True
-            timetable.save()
-        
-        print(f"Activated timetable '{timetable.name}'")
+        logger.info('timetable activated id=%s name=%r', timetable.pk, timetable.name)
         return Response({'status': 'Timetable activated successfully'})
 
+    @action(detail=True, methods=['post'])
+    def repair(self, request, pk=None):
+        """
+        Re-solve only the entries invalidated by data edits.
+        Optional: "slots" lists extra time slot ids to re-solve.
+        """
+        timetable = self.get_object()
+        try:
+            slot_ids = [int(slot_id) for slot_id in request.data.get('slots', [])]
+        except (TypeError, ValueError):
+            return Response({'error': '"slots" must be a list of time slot ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            stats = TimetableRepairer().repair(timetable, slot_ids)
+        except InputsChanged as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        logger.info('timetable repaired id=%s removed=%s added=%s repair_time=%s',
+                    timetable.pk, stats['entries_removed'], stats['entries_added'], stats['repair_time'])
+        return Response(stats)
+
 
-class TimetableEntryViewSet(viewsets.ModelViewSet):
+class TimetableEntryViewSet(CachedReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing timetable entries.
     Data will be saved to database and persist across server restarts.
+    The list filters on ?timetable= (ids or "active"), ?teacher=, ?classroom=,
+    ?day= and a ?from=09:00&to=13:00 time range.
+    Pages are keyset cursors in id order (follow "next"); ?stream=true returns
+    the whole filtered list as one streamed JSON array, ?stream=ndjson as NDJSON.
     """
     queryset = TimetableEntry.objects.all().select_related(
         'subject', 'teacher', 'classroom', 'time_slot'
-    ).order_by('timetable', 'time_slot__day', 'time_slot__start_time')
+    ).prefetch_related('teacher__subjects').order_by('timetable', 'time_slot__day', 'time_slot__start_time')
     serializer_class = TimetableEntrySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = EntryCursorPagination
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            try:
+                queryset = queryset.filter(**entry_filters(self.request.query_params))
+            except ValueError as e:
+                raise ValidationError({'error': str(e)})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """List entries; ?normalized=true side-loads related objects once per page"""
+        stream = request.query_params.get('stream', '').lower()
+        if stream in ('1', 'true', 'yes', 'ndjson'):
+            return self.stream_list(ndjson=stream == 'ndjson')
+        if not wants_normalized(request):
+            return super().list(request, *args, **kwargs)
+        return cached_response(request, self.normalized_list)
+
+    def stream_list(self, ndjson=False):
+        """Serialize the filtered entries batch by batch into a streamed response"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return json_stream_response(
+            keyset_batches(queryset), lambda batch: self.get_serializer(batch, many=True).data, ndjson
+        )
+
+    def normalized_list(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(normalize_entries(page))
+        return Response(normalize_entries(list(queryset)))
 
     def perform_create(self, serializer):
         """Save timetable entry to database"""
         serializer.save()
-        entry = serializer.instance
-        if entry.is_break:
-            print(f"TimetableEntry saved: BREAK at {entry.time_slot}")
-        else:
-            print(f"TimetableEntry saved: {entry.subject.name} with {entry.teacher.name} in {entry.classroom.number} at {entry.time_slot}")
+        log_entry('created', serializer.instance)
 
     def perform_update(self, serializer):
         """Update timetable entry in database"""
         serializer.save()
-        entry = serializer.instance
-        if entry.is_break:
-            print(f"TimetableEntry updated: BREAK at {entry.time_slot}")
-        else:
-            print(f"TimetableEntry updated: {entry.subject.name} with {entry.teacher.name} in {entry.classroom.number} at {entry.time_slot}")
+        log_entry('updated', serializer.instance)
 
     def perform_destroy(self, instance):
         """Delete timetable entry from database"""
-        if instance.is_break:
-            print(f"TimetableEntry deleted: BREAK at {instance.time_slot}")
-        else:
-            print(f"TimetableEntry deleted: {instance.subject.name} with {instance.teacher.name} in {instance.classroom.number} at {instance.time_slot}")
+        log_entry('deleted', instance)
         instance.delete()
 
 
+class GenerationJobViewSet(SparseFieldsMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for background timetable generation.
+    POST {"name": ..., "engine": ..., "seeds": ...} queues a job and returns 202;
+    GET /api/generation-jobs/<id>/ reports status and progress.
+    """
+    queryset = GenerationJob.objects.all().order_by('-created_at')
+    serializer_class = GenerationJobSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        """Fail jobs left behind by a stopped server process before reporting on them"""
+        fail_orphaned_jobs()
+        return super().get_queryset()
+
+    def create(self, request, *args, **kwargs):
+        """Queue a generation job"""
+        try:
+            options = generation_options(request.data)
+        except (TypeError, ValueError) as e:
+            return Response({'error': f'Invalid generation options: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        job = submit_job(request.data.get('name', 'Auto-generated Timetable'), options)
+        logger.info('generation_job queued id=%s name=%r', job.pk, job.name)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a pending or running job"""
+        job = cancel_job(self.get_object())
+        return Response(self.get_serializer(job).data)
+
+
 # ============================================
 # Web Form Views (User Input)
 # ============================================
 
+HOME_SECTION_SIZE = 25
+
+
+def section_page(request, name, queryset, count):
+    """One page of a home page section, picked with ?<name>_page=; count comes from the counters"""
+    paginator = Paginator(queryset, HOME_SECTION_SIZE)
+    paginator.count = count
+    return paginator.get_page(request.GET.get(f'{name}_page'))
+
+
 def home_view(request):
-    """Home page showing all data and navigation"""
-    subjects = Subject.objects.all().order_by('code')
-    teachers = Teacher.objects.all().order_by('name')
-    classrooms = Classroom.objects.all().order_by('number')
-    time_slots = TimeSlot.objects.all().order_by('day', 'start_time')
-    timetables = Timetable.objects.all().order_by('-created_at')
-    active_timetable = Timetable.objects.filter(is_active=True).first()
+    """Home page showing data sections one page at a time, and navigation"""
+    statistics = read_statistics()
+    active = statistics['active_timetable']
     
     context = {
-        'subjects': subjects,
-        'teachers': teachers,
-        'classrooms': classrooms,
-        'time_slots': time_slots,
-        'timetables': timetables,
-        'active_timetable': active_timetable,
-        'total_subjects': subjects.count(),
-        'total_teachers': teachers.count(),
-        'total_classrooms': classrooms.count(),
-        'total_timetables': timetables.count(),
-        'total_time_slots': time_slots.count(),
+        'subjects': section_page(request, 'subjects', Subject.objects.all().order_by('code'), statistics['subjects']),
+        'teachers': section_page(request, 'teachers', Teacher.objects.all().order_by('name'), statistics['teachers']),
+        'classrooms': section_page(request, 'classrooms', Classroom.objects.all().order_by('number'), statistics['classrooms']),
+        'time_slots': section_page(request, 'time_slots', TimeSlot.objects.all().order_by('day', 'start_time'), statistics['time_slots']),
+        'timetables': section_page(request, 'timetables', Timetable.objects.all().order_by('-created_at'), statistics['timetables']),
+        'active_timetable': Timetable.objects.filter(pk=active['id']).first() if active else None,
+        'total_subjects': statistics['subjects'],
+        'total_teachers': statistics['teachers'],
+        'total_classrooms': statistics['classrooms'],
+        'total_timetables': statistics['timetables'],
+        'total_time_slots': statistics['time_slots'],
     }
     return render(request, 'timetable/home.html', context)
 
@@ -458,6 +652,7 @@ def generate_timetable_view(request):
     """Web page to generate timetable"""
     if request.method == 'POST':
         name = request.POST.get('name', 'Auto-generated Timetable')
+        engine = request.POST.get('engine', 'greedy')
         
         # Check if we have enough data
         if Subject.objects.count() == 0:
@@ -474,21 +669,12 @@ def generate_timetable_view(request):
             return redirect('generate_timetable')
         
         try:
-            with transaction.atomic():
-                # Deactivate all previous timetables
-                Timetable.objects.filter(is_active=True).update(is_active=False)
-                
-                # Generate new timetable
-                generator = TimetableGenerator()
-                timetable = generator.generate_timetable(name)
-                
-                # Activate the new timetable
-                timetable.is_active = True
-                timetable.save()
-                
-                messages.success(request, f'Timetable "{timetable.name}" generated successfully with {timetable.entries.count()} entries!')
-                return redirect('timetable_detail', timetable_id=timetable.id)
-                
+            # Generate the new timetable, or share an identical solve already running
+            timetable, stats = get_coordinator().generate(name, {'engine': engine})
+            
+            messages.success(request, f'Timetable "{timetable.name}" generated successfully with {stats["rows_written"]} entries!')
+            return redirect('timetable_detail', timetable_id=timetable.id)
+        
         except Exception as e:
             messages.error(request, f'Timetable generation failed: {str(e)}')
             return redirect('generate_timetable')
@@ -500,6 +686,28 @@ def generate_timetable_view(request):
 # Edit/Delete Views
 # ============================================
 
+def repair_after_edit(request, slot_ids=()):
+    """Patch the active timetable after an edit instead of regenerating it"""
+    try:
+        stats = repair_active_timetable(slot_ids)
+    except InputsChanged as e:
+        messages.warning(request, f'Active timetable was not updated: {e}')
+        return
+    if stats and (stats['entries_removed'] or stats['entries_added']):
+        messages.info(
+            request,
+            f"Active timetable updated: {stats['entries_removed']} entries removed, {stats['entries_added']} added."
+        )
+
+
+def active_slots(**filters):
+    """Time slot ids of active timetable entries matching filters"""
+    active_id = active_timetable_id()
+    if active_id is None:
+        return []
+    return list(TimetableEntry.objects.filter(timetable_id=active_id, **filters).values_list('time_slot_id', flat=True))
+
+
 def edit_subject(request, subject_id):
     """Edit an existing subject"""
     subject = get_object_or_404(Subject, id=subject_id)
@@ -509,6 +717,7 @@ def edit_subject(request, subject_id):
         if form.is_valid():
             form.save()
             messages.success(request, f'Subject "{subject.name}" updated successfully!')
+            repair_after_edit(request)
             return redirect('subjects')
     else:
         form = SubjectForm(instance=subject)
@@ -525,8 +734,10 @@ def delete_subject(request, subject_id):
     
     if request.method == 'POST':
         subject_name = subject.name
+        slot_ids = active_slots(subject=subject)
         subject.delete()
         messages.success(request, f'Subject "{subject_name}" deleted successfully!')
+        repair_after_edit(request, slot_ids)
         return redirect('subjects')
     
     return render(request, 'timetable/delete_subject.html', {'subject': subject})
@@ -541,6 +752,7 @@ def edit_teacher(request, teacher_id):
         if form.is_valid():
             form.save()
             messages.success(request, f'Teacher "{teacher.name}" updated successfully!')
+            repair_after_edit(request)
             return redirect('teachers')
     else:
         form = TeacherForm(instance=teacher)
@@ -557,8 +769,10 @@ def delete_teacher(request, teacher_id):
     
     if request.method == 'POST':
         teacher_name = teacher.name
+        slot_ids = active_slots(teacher=teacher)
         teacher.delete()
         messages.success(request, f'Teacher "{teacher_name}" deleted successfully!')
+        repair_after_edit(request, slot_ids)
         return redirect('teachers')
     
     return render(request, 'timetable/delete_teacher.html', {'teacher': teacher})
@@ -573,6 +787,7 @@ def edit_classroom(request, classroom_id):
         if form.is_valid():
             form.save()
             messages.success(request, f'Classroom "{classroom.number}" updated successfully!')
+            repair_after_edit(request)
             return redirect('classrooms')
     else:
         form = ClassroomForm(instance=classroom)
@@ -589,8 +804,10 @@ def delete_classroom(request, classroom_id):
     
     if request.method == 'POST':
         classroom_number = classroom.number
+        slot_ids = active_slots(classroom=classroom)
         classroom.delete()
         messages.success(request, f'Classroom "{classroom_number}" deleted successfully!')
+        repair_after_edit(request, slot_ids)
         return redirect('classrooms')
     
     return render(request, 'timetable/delete_classroom.html', {'classroom': classroom})
@@ -605,6 +822,7 @@ def edit_time_slot(request, timeslot_id):
         if form.is_valid():
             form.save()
             messages.success(request, f'Time slot updated successfully!')
+            repair_after_edit(request)
             return redirect('time_slots')
     else:
         form = TimeSlotForm(instance=time_slot)
@@ -621,8 +839,11 @@ def delete_time_slot(request, timeslot_id):
     
     if request.method == 'POST':
         time_slot_str = f"{time_slot.day} {time_slot.start_time}-{time_slot.end_time}"
+        # Lectures deleted with the slot may fit in the rest of its day
+        slot_ids = list(TimeSlot.objects.filter(day=time_slot.day).exclude(pk=time_slot.pk).values_list('id', flat=True))
         time_slot.delete()
         messages.success(request, f'Time slot "{time_slot_str}" deleted successfully!')
+        repair_after_edit(request, slot_ids)
         return redirect('time_slots')
     
     return render(request, 'timetable/delete_time_slot.html', {'time_slot': time_slot})
@@ -632,18 +853,35 @@ def delete_time_slot(request, timeslot_id):
 # API Views for Data Operations
 # ============================================
 
-@api_view(['GET'])
-def get_all_data(request):
+class AllDataView(CachedReadMixin, APIView):
     """Get all data in one API call"""
-    data = {
-        'subjects': SubjectSerializer(Subject.objects.all(), many=True).data,
-        'teachers': TeacherSerializer(Teacher.objects.all(), many=True).data,
-        'classrooms': ClassroomSerializer(Classroom.objects.all(), many=True).data,
-        'time_slots': TimeSlotSerializer(TimeSlot.objects.all(), many=True).data,
-        'timetables': TimetableSerializer(Timetable.objects.all(), many=True).data,
-        'active_timetable': TimetableSerializer(Timetable.objects.filter(is_active=True).first()).data if Timetable.objects.filter(is_active=True).exists() else None,
-    }
-    return Response(data)
+    
+    def get(self, request):
+        return cached_response(request, self.all_data)
+    
+    def all_data(self):
+        """
+        Timetables are summaries, as in the timetable list. The active one adds its
+        entries with related objects as ids; those objects are listed above it.
+        """
+        timetables = with_entry_counts(Timetable.objects.order_by('-created_at'))
+        active_id = active_timetable_id()
+        active = timetables.filter(pk=active_id).first() if active_id else None
+        if active is not None:
+            entries = TimetableEntry.objects.filter(timetable_id=active_id).order_by('time_slot__day', 'time_slot__start_time')
+            active = dict(TimetableSummarySerializer(active).data, entries=TimetableEntryIdSerializer(entries, many=True).data)
+        data = {
+            'subjects': SubjectSerializer(Subject.objects.all(), many=True).data,
+            'teachers': TeacherSerializer(Teacher.objects.prefetch_related('subjects'), many=True).data,
+            'classrooms': ClassroomSerializer(Classroom.objects.all(), many=True).data,
+            'time_slots': TimeSlotSerializer(TimeSlot.objects.all(), many=True).data,
+            'timetables': TimetableSummarySerializer(timetables, many=True).data,
+            'active_timetable': active,
+        }
+        return Response(data)
+
+
+get_all_data = AllDataView.as_view()
 
 
 @api_view(['DELETE'])
@@ -667,8 +905,9 @@ def clear_all_data(request):
                 Teacher.objects.all().delete()
                 Classroom.objects.all().delete()
                 TimeSlot.objects.all().delete()
+                rebuild_counters()
                 
-                print("All data cleared from database")
+                logger.warning('all data cleared counts=%s', count)
                 return Response({
                     'message': 'All data cleared successfully',
                     'deleted_counts': count
@@ -682,146 +921,91 @@ def clear_all_data(request):
 # Utility Views
 # ============================================
 
-class DatabaseStatusView(APIView):
+class DatabaseStatusView(CachedReadMixin, APIView):
     """Check database connection and data status"""
     
     def get(self, request):
+        return cached_response(request, self.status_response)
+    
+    def status_response(self):
+        """Counts come from the maintained counters in api.statistics, not table scans"""
+        statistics = read_statistics()
         status_data = {
             'database_connected': True,
-            'total_subjects': Subject.objects.count(),
-            'total_teachers': Teacher.objects.count(),
-            'total_classrooms': Classroom.objects.count(),
-            'total_time_slots': TimeSlot.objects.count(),
-            'total_timetables': Timetable.objects.count(),
-            'total_timetable_entries': TimetableEntry.objects.count(),
-            'active_timetable': None,
+            'total_subjects': statistics['subjects'],
+            'total_teachers': statistics['teachers'],
+            'total_classrooms': statistics['classrooms'],
+            'total_time_slots': statistics['time_slots'],
+            'total_timetables': statistics['timetables'],
+            'total_timetable_entries': statistics['timetable_entries'],
+            'active_timetable': statistics['active_timetable'],
         }
         
-        active_timetable = Timetable.objects.filter(is_active=True).first()
-        if active_timetable:
-            status_data['active_timetable'] = {
-                'id': active_timetable.id,
-                'name': active_timetable.name,
-                'entries_count': active_timetable.entries.count(),
-            }
-        
         return Response(status_data)
 
 
 @api_view(['GET'])
 def validate_data_for_generation(request):
     """Validate if we have enough data to generate a timetable"""
-    errors = []
-    warnings = []
-    
-    # Check subjects
-    subjects = Subject.objects.all()
-    if not subjects.exists():
-        errors.append('No subjects found. Add at least one subject.')
-    else:
-        warnings.append(f'Found {subjects.count()} subjects')
-    
-    # Check teachers
-    teachers = Teacher.objects.all()
-    if not teachers.exists():
-        errors.append('No teachers found. Add at least one teacher.')
-    else:
-        # Validate teacher-subject assignments
-        for teacher in teachers:
-            if not teacher.subjects.exists():
-                errors.append(f"Teacher '{teacher.name}' has no subjects assigned.")
-        warnings.append(f'Found {teachers.count()} teachers')
-    
-    # Check classrooms
-    classrooms = Classroom.objects.all()
-    if not classrooms.exists():
-        errors.append('No classrooms found. Add at least one classroom.')
-    else:
-        warnings.append(f'Found {classrooms.count()} classrooms')
+    problem = load_problem()
+    report = check_feasibility(problem)
     
-    # Check time slots
-    time_slots = TimeSlot.objects.all()
-    if not time_slots.exists():
-        errors.append('No time slots found. Add at least one time slot.')
-    else:
-        class_slots = time_slots.filter(is_break=False)
-        break_slots = time_slots.filter(is_break=True)
-        warnings.append(f'Found {time_slots.count()} time slots ({class_slots.count()} class slots, {break_slots.count()} break slots)')
-    
-    # Check for teacher availability vs time slots
-    if teachers.exists() and time_slots.exists():
-        for teacher in teachers:
-            available_hours = []
-            if teacher.start_time and teacher.end_time:
-                # Check if any timeslot falls within teacher's availability
-                available_count = time_slots.filter(
-                    is_break=False,
-                    start_time__gte=teacher.start_time,
-                    end_time__lte=teacher.end_time
-                ).count()
-                if available_count == 0:
-                    warnings.append(f"Teacher '{teacher.name}' has no available timeslots within their working hours")
-    
-    # Validate subject-classroom compatibility
-    if subjects.exists() and classrooms.exists():
-        for subject in subjects:
-            suitable_rooms = classrooms.filter(
-                models.Q(type='Both') | models.Q(type=subject.type)
-            ).count()
-            if suitable_rooms == 0:
-                warnings.append(f"No suitable classrooms found for {subject.type} subject '{subject.name}'")
+    warnings = [
+        f'Found {problem.subject_count} subjects',
+        f'Found {problem.teacher_count} teachers',
+        f'Found {problem.room_count} classrooms',
+        f'Found {problem.slot_count + len(problem.break_slot_ids)} time slots '
+        f'({problem.slot_count} class slots, {len(problem.break_slot_ids)} break slots)',
+    ] + report.warnings
     
     # Check active timetable requirements
-    active_timetable = Timetable.objects.filter(is_active=True).first()
-    if active_timetable and active_timetable.entries.exists():
-        entries = active_timetable.entries.all()
-        scheduled_hours = entries.filter(is_break=False).count()
-        break_hours = entries.filter(is_break=True).count()
-        warnings.append(f'Currently active timetable has {scheduled_hours} class entries and {break_hours} break entries')
+    active_counts = TimetableEntry.objects.filter(timetable_id=active_timetable_id()).aggregate(
+        scheduled=Count('id', filter=Q(is_break=False)),
+        breaks=Count('id', filter=Q(is_break=True))
+    )
+    if active_counts['scheduled'] or active_counts['breaks']:
+        warnings.append(
+            f"Currently active timetable has {active_counts['scheduled']} class entries "
+            f"and {active_counts['breaks']} break entries"
+        )
     
     return Response({
-        'valid': len(errors) == 0,
-        'errors': errors,
-        'warnings': warnings
+        'valid': report.valid,
+        'errors': report.errors,
+        'warnings': warnings,
+        'bounds': report.bounds
     })
 
 
 def export_data_json(request):
-    """Export all data as JSON"""
-    data = {
-        'subjects': list(Subject.objects.all().values()),
-        'teachers': list(Teacher.objects.all().values()),
-        'classrooms': list(Classroom.objects.all().values()),
-        'time_slots': list(TimeSlot.objects.all().values()),
-        'timetables': list(Timetable.objects.all().values()),
-        'timetable_entries': list(TimetableEntry.objects.all().values()),
-    }
-    
-    response = JsonResponse(data, json_dumps_params={'indent': 2})
-    response['Content-Disposition'] = 'attachment; filename="timetable_data.json"'
-    return response
+    """
+    Export all data as JSON, streamed table by table.
+    ?format=ndjson writes one {"model": ..., "data": ...} record per line;
+    ?gzip=1 compresses the stream on the fly.
+    """
+    return data_export_response(
+        ndjson=request.GET.get('format') == 'ndjson',
+        compress=request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+    )
 
 
 @csrf_exempt
 def import_data_json(request):
-    """Import data from JSON"""
+    """
+    Import data from JSON in the export_data_json format.
+    NDJSON is read line by line when sent as application/x-ndjson or with ?format=ndjson;
+    gzipped bodies are accepted with Content-Encoding: gzip or ?gzip=1.
+    """
     if request.method == 'POST':
+        ndjson = request.GET.get('format') == 'ndjson' or request.content_type == 'application/x-ndjson'
+        compressed = request.headers.get('Content-Encoding') == 'gzip' or \
+            request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
         try:
-            data = json.loads(request.body)
-            
-            with transaction.atomic():
-                # Import subjects
-                if 'subjects' in data:
-                    for subject_data in data['subjects']:
-                        Subject.objects.update_or_create(
-                            code=subject_data['code'],
-                            defaults=subject_data
-                        )
-                
-                # Import other models similarly...
-                # (Add similar blocks for teachers, classrooms, etc.)
-                
-            return JsonResponse({'message': 'Data imported successfully'})
+            result = import_data(request, ndjson=ndjson, compressed=compressed)
+        except (ValueError, OSError, EOFError, IntegrityError) as e:
+            return JsonResponse({'error': str(e)}, status=400)
         
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
\ No newline at end of file
+        logger.info('data imported rows=%s import_time=%s', sum(result['imported'].values()), result['import_time'])
+        return JsonResponse({'message': 'Data imported successfully', **result})
+    
+    return JsonResponse({'error': 'Use POST to import data'}, status=405)
\ No newline at end of file
@@ -15,6 +15,19 @@ from django.db import transaction
 from api.models import Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry
 from api.timetable_generator import TimetableGenerator
 
+def api_request(view, method, path='/', data=None, user=None, **kwargs):
+    """Call an API view as a logged-in user; the api urls are not routed by Firstproject"""
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    
+    factory = APIRequestFactory(SERVER_NAME='localhost')
+    if method == 'get':
+        request = factory.get(path, data)
+    else:
+        request = getattr(factory, method)(path, data, format='json')
+    force_authenticate(request, user or User.objects.get_or_create(username='test-fixes')[0])
+    return view(request, **kwargs)
+
 def test_model_null_fks():
     """Test that TimetableEntry can have NULL foreign keys"""
     print("\n=== Testing TimetableEntry NULL FKs ===")
@@ -162,6 +175,619 @@ def test_timetable_generator():
     print("✓ TimetableGenerator creates correct break and class entries")
     return True
 
+def test_csp_engine():
+    """Test that the CSP engine produces a deterministic, conflict-free schedule"""
+    print("\n=== Testing CSP Engine ===")
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    first = TimetableGenerator(engine='csp').generate_timetable("CSP Schedule")
+    second = TimetableGenerator(engine='csp').generate_timetable("CSP Schedule 2")
+    
+    def signature(timetable):
+        return sorted(
+            timetable.entries.filter(is_break=False).values_list('time_slot', 'teacher', 'classroom', 'subject')
+        )
+    
+    class_entries = first.entries.filter(is_break=False).select_related('subject', 'classroom')
+    print(f"Generated {class_entries.count()} class entries")
+    
+    assert class_entries.exists(), "CSP engine should schedule at least one lecture"
+    assert signature(first) == signature(second), "CSP engine should be deterministic"
+    
+    slots_seen = set()
+    for entry in class_entries:
+        assert entry.classroom.type in ('Both', entry.subject.type), "Classroom should suit the subject"
+        key = (entry.time_slot_id, entry.teacher_id)
+        assert key not in slots_seen, "Teacher should not be double-booked"
+        slots_seen.add(key)
+    
+    print("✓ CSP engine schedules conflict-free lectures deterministically")
+    return True
+
+def test_slot_matching():
+    """Test that each slot is filled with a maximum teacher-room matching"""
+    print("\n=== Testing Slot Matching ===")
+    
+    from api.matching import hopcroft_karp
+    
+    # Teacher 0 can only use room 'lab'; a first-come pick of 'lab' for teacher 1 would strand it
+    edges = {1: ['lab', 'r1'], 0: ['lab'], 2: ['r1', 'r2']}
+    matching = hopcroft_karp([1, 0, 2], edges)
+    
+    assert len(matching) == 3, "Every teacher should get a room"
+    assert len(set(matching.values())) == 3, "No room should be used twice"
+    assert all(room in edges[teacher] for teacher, room in matching.items()), "Rooms should suit the teacher"
+    
+    print("✓ Slot matching uses every room it can")
+    return True
+
+def test_read_cache_version():
+    """Test that data changes bump the read cache version"""
+    print("\n=== Testing Read Cache Version ===")
+    
+    from api.caching import data_version
+    
+    subject = Subject.objects.create(name="Cache Test", code="CACHE1", type="Theory", credits=1)
+    version = data_version()
+    subject.name = "Cache Test Renamed"
+    subject.save()
+    assert data_version() > version, "Saving a subject should bump the data version"
+    
+    # Teacher subject links bump each version once per write, after it
+    from api.statistics import input_version
+    
+    teacher = Teacher.objects.first()
+    version, inputs = data_version(), input_version()
+    teacher.subjects.add(subject)
+    assert data_version() == version + 1, "Linking a subject should bump the data version once"
+    assert input_version() == inputs + 1, "Linking a subject should bump the input version once"
+    teacher.subjects.remove(subject)
+    
+    version = data_version()
+    subject.delete()
+    assert data_version() > version, "Deleting a subject should bump the data version"
+    
+    # The version is shared through the database, not this process's cache
+    from django.core.cache import cache
+    from api.statistics import rebuild_counters
+    
+    version = data_version()
+    cache.clear()
+    rebuild_counters()
+    assert data_version() == version, "The data version should survive cache clears and counter rebuilds"
+    
+    print("✓ Data changes invalidate cached reads")
+    return True
+
+def test_metrics_registry():
+    """Test that request metrics render as Prometheus text"""
+    print("\n=== Testing Request Metrics ===")
+    
+    from api.metrics import MetricsRegistry, RequestMetrics
+    
+    registry = MetricsRegistry(sample_size=10)
+    metrics = RequestMetrics()
+    metrics.queries = 3
+    registry.observe('subject-list', 'GET', 200, metrics, 0.02, 512)
+    text = registry.render()
+    
+    assert 'schedulix_requests_total{route="subject-list",method="GET",status="200"} 1' in text
+    assert 'schedulix_db_queries_bucket{route="subject-list",method="GET",le="5"} 1' in text
+    assert 'schedulix_request_latency_seconds{route="subject-list",method="GET",quantile="0.99"} 0.02' in text
+    
+    print("✓ Per-route metrics are exported")
+    return True
+
+def test_activate_timetable_api():
+    """Test that activating a timetable through the API swaps the active one"""
+    print("\n=== Testing Timetable Activation ===")
+    
+    from api.views import TimetableViewSet
+    
+    first = Timetable.objects.create(name="Activation A", is_active=True)
+    second = Timetable.objects.create(name="Activation B", is_active=False)
+    
+    view = TimetableViewSet.as_view({'patch': 'partial_update'})
+    response = api_request(view, 'patch', f'/api/timetables/{second.id}/', {'is_active': True}, pk=second.id)
+    assert response.status_code == 200, f"Activation should succeed: {response.data}"
+    
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert second.is_active, "Patched timetable should be active"
+    assert not first.is_active, "Previous timetable should be deactivated"
+    assert Timetable.objects.filter(is_active=True).count() == 1, "Only one timetable should be active"
+    
+    print("✓ PATCH is_active swaps the active timetable")
+    return True
+
+def test_seeded_generation_memo():
+    """Test that repeating a seeded generate request reuses the stored solve and serializes it in fixed queries"""
+    print("\n=== Testing Seeded Generation Memo ===")
+    
+    import re
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from api.views import TimetableViewSet
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    view = TimetableViewSet.as_view({'post': 'generate'})
+    user = User.objects.get_or_create(username='test-fixes')[0]
+    for body in ({'seed': 7}, {'seeds': [11]}):
+        first = api_request(view, 'post', '/api/timetables/generate/', dict(body, name="Seeded"), user=user)
+        with CaptureQueriesContext(connection) as queries:
+            second = api_request(view, 'post', '/api/timetables/generate/', dict(body, name="Seeded again"), user=user)
+        assert first.status_code == 201, f"Generation should succeed: {first.data}"
+        assert second.status_code == 201, f"Generation should succeed: {second.data}"
+        assert not first.data['generation_stats']['memo_hit'], f"First {body} solve should run the solver"
+        assert second.data['generation_stats']['memo_hit'], f"Repeated {body} solve should be memoized"
+        lookups = [query['sql'] for query in queries.captured_queries if re.search(
+            r'"api_(subject|teacher|classroom|timeslot|teachersubject)"\."(id|teacher_id)" = \d', query['sql'])]
+        assert not lookups, f"Generated entries should be serialized without per-entry queries: {lookups}"
+    
+    print("✓ Seeded generate requests are memoized")
+    return True
+
+def test_sparse_entry_queries():
+    """Test that ?expand= drops the joins and prefetches of unexpanded relations"""
+    print("\n=== Testing Sparse Entry Queries ===")
+    
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from api.views import TimetableEntryViewSet
+    
+    # Reuses the lectures generated by the earlier tests
+    assert TimetableEntry.objects.filter(teacher__isnull=False).exists(), "Expected scheduled lectures"
+    view = TimetableEntryViewSet.as_view({'get': 'list'})
+    user = User.objects.get_or_create(username='test-fixes')[0]
+    
+    def count_queries(params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_request(view, 'get', '/api/timetable-entries/', params, user=user)
+        assert response.status_code == 200, response.data
+        return len(queries)
+    
+    # Every read also looks up the data version for its ETag
+    full = count_queries({})
+    assert full == 3, f"Full entries should take the list query and one prefetch, took {full}"
+    for expand in ('subject', 'classroom,time_slot', ''):
+        queries = count_queries({'expand': expand})
+        assert queries == 2, f"?expand={expand} should not prefetch teacher subjects, took {queries} queries"
+    assert count_queries({'expand': 'teacher'}) == 3, "Expanded teachers still need their subjects prefetched"
+    
+    print("✓ ?expand= prunes unused prefetches")
+    return True
+
+def test_generation_job_progress():
+    """Test that generation jobs keep their progress when they finish or are cancelled"""
+    print("\n=== Testing Generation Job Progress ===")
+    
+    import subprocess
+    import threading
+    from api.coordinator import get_coordinator
+    from api.jobs import JobProgress, cancel_job, fail_orphaned_jobs, run_job, worker_id
+    from api.models import GenerationJob
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    job = GenerationJob.objects.create(name="Job Test", params={'engine': 'greedy'})
+    run_job(job.id)
+    job.refresh_from_db()
+    assert job.status == 'succeeded', f"Job should succeed: {job.error}"
+    assert job.timetable is not None, "Job should point at its timetable"
+    assert job.total_slots > 0 and job.processed_slots == job.total_slots, "Finished job should be at 100%"
+    
+    # Cancel after the first progress write
+    job = GenerationJob.objects.create(name="Cancelled Job Test", params={'engine': 'greedy'})
+    write_progress = JobProgress.__call__
+    
+    def cancel_on_progress(progress, done, total):
+        GenerationJob.objects.filter(pk=progress.job_id).update(cancel_requested=True)
+        write_progress(progress, done, total)
+    
+    JobProgress.__call__ = cancel_on_progress
+    try:
+        run_job(job.id)
+    finally:
+        JobProgress.__call__ = write_progress
+    job.refresh_from_db()
+    assert job.status == 'cancelled', f"Job should be cancelled, is {job.status}"
+    assert job.total_slots > 0, "Cancelled job should keep the progress it reported"
+    assert job.finished_at is not None, "Cancelled job should record when it stopped"
+    
+    # A job queued behind busy solve slots can still be cancelled
+    coordinator = get_coordinator()
+    held = 0
+    while coordinator.slots.acquire(blocking=False):
+        held += 1
+    try:
+        job = GenerationJob.objects.create(name="Queued Job Test", params={'engine': 'greedy'})
+        worker = threading.Thread(target=run_job, args=(job.id,))
+        worker.start()
+        while worker.is_alive() and not GenerationJob.objects.filter(pk=job.pk, status='running').exists():
+            worker.join(0.05)
+        cancel_job(job)
+        worker.join(10)
+        assert not worker.is_alive(), "Queued job should stop waiting once cancelled"
+    finally:
+        for _ in range(held):
+            coordinator.slots.release()
+    job.refresh_from_db()
+    assert job.status == 'cancelled', f"Queued job should be cancelled, is {job.status}"
+    
+    # Jobs whose server process exited are failed when jobs are read
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    host = worker_id().rpartition(':')[0]
+    orphan = GenerationJob.objects.create(name="Orphaned Job Test", status='running', worker=f'{host}:{exited.pid}')
+    live = GenerationJob.objects.create(name="Live Job Test", status='running', worker=worker_id())
+    try:
+        assert fail_orphaned_jobs() == 1, "Only the job of the exited process should be orphaned"
+        orphan.refresh_from_db()
+        live.refresh_from_db()
+        assert orphan.status == 'failed' and orphan.finished_at is not None, f"Orphaned job should fail, is {orphan.status}"
+        assert live.status == 'running', "A job of a running process should be left alone"
+    finally:
+        live.delete()
+    
+    print("✓ Generation jobs report progress and cancel cleanly")
+    return True
+
+def test_import_round_trip():
+    """Test that an export imports back, and that bad imports are rejected without writing"""
+    print("\n=== Testing Data Import ===")
+    
+    import json
+    from django.test import RequestFactory
+    from api.exporters import data_export_response
+    from api.views import import_data_json
+    
+    def import_body(body, content_type='application/json'):
+        request = RequestFactory(SERVER_NAME='localhost').post('/api/import-json/', body, content_type=content_type)
+        response = import_data_json(request)
+        return response.status_code, json.loads(response.content)
+    
+    # Round trip: reference data is upserted, timetables and their entries are added
+    export = b''.join(data_export_response().streaming_content)
+    before = {model: model.objects.count() for model in (Subject, Teacher, Classroom, TimeSlot, Timetable, TimetableEntry)}
+    status, result = import_body(export)
+    assert status == 200, f"Import should succeed: {result}"
+    for model in (Subject, Teacher, Classroom, TimeSlot):
+        assert model.objects.count() == before[model], f"{model.__name__} rows should be upserted, not duplicated"
+    assert Timetable.objects.count() == 2 * before[Timetable], "Timetables should be added"
+    assert TimetableEntry.objects.count() == 2 * before[TimetableEntry], "Entries should be added"
+    assert Timetable.objects.filter(is_active=True).count() == 1, "Only one timetable should be active"
+    
+    # Bad input is a 400 and leaves the data untouched
+    before = {model: model.objects.count() for model in (Subject, TimeSlot, Timetable)}
+    bad_imports = [
+        {'subjects': [{'id': 1, 'code': 'IMP1', 'name': 'Import', 'type': 'Theory', 'credits': 1}],
+         'time_slots': [{'id': 1, 'day': 'Monday', 'start_time': '25:00', 'end_time': '26:00'}]},
+        {'time_slots': [{'id': 1, 'day': 'Monday', 'start_time': 'soon', 'end_time': '10:00'}]},
+        {'timetables': [{'id': 1, 'name': 'Imported'}],
+         'timetable_entries': [{'timetable_id': 1, 'day': 'Monday', 'time_slot_id': 999}]},
+        {'rooms': []},
+    ]
+    for body in bad_imports:
+        status, result = import_body(json.dumps(body))
+        assert status == 400, f"Bad import should be rejected: {body} -> {status} {result}"
+    status, result = import_body('{"subjects": [')
+    assert status == 400, "Malformed JSON should be rejected"
+    for model, count in before.items():
+        assert model.objects.count() == count, f"Rejected imports should not write {model.__name__} rows"
+    
+    print("✓ Imports round-trip and reject bad data")
+    return True
+
+def test_all_data_summaries():
+    """Test that get-all-data lists timetables as summaries in a fixed number of queries"""
+    print("\n=== Testing All Data Endpoint ===")
+    
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from api.views import get_all_data
+    
+    # Reuses the timetables generated by the earlier tests
+    assert Timetable.objects.count() > 1, "Expected several timetables"
+    user = User.objects.get_or_create(username='test-fixes')[0]
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = api_request(get_all_data, 'get', '/api/get-all-data/', user=user)
+    assert response.status_code == 200, response.data
+    assert len(queries) <= 10, f"get-all-data should not query per timetable or teacher, took {len(queries)}"
+    
+    for timetable in response.data['timetables']:
+        assert 'entries' not in timetable, "Timetable list should not embed entries"
+        assert 'entry_count' in timetable, "Timetable list should report entry counts"
+    active = response.data['active_timetable']
+    assert active['entry_count'] == len(active['entries']), "Active timetable should list all its entries"
+    assert all(isinstance(entry['time_slot'], int) for entry in active['entries']), "Entries should reference slots by id"
+    
+    print("✓ get-all-data returns timetable summaries")
+    return True
+
+def test_csv_export():
+    """Test that CSV exports stream every entry and slice by teacher"""
+    print("\n=== Testing CSV Export ===")
+    
+    import csv
+    from api.views import TimetableViewSet
+    
+    def rows(response):
+        assert response.status_code == 200, getattr(response, 'data', response.status_code)
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+    
+    # Reuses the timetables generated by the earlier tests
+    lecture = TimetableEntry.objects.filter(is_break=False).select_related('timetable').first()
+    timetable = lecture.timetable
+    export_csv = TimetableViewSet.as_view({'get': 'export_csv'})
+    path = f'/api/timetables/{timetable.id}/export_csv/'
+    
+    full = rows(api_request(export_csv, 'get', path, pk=timetable.id))
+    assert full[0] == ['Day', 'Start Time', 'End Time', 'Subject', 'Teacher', 'Classroom', 'Type']
+    assert len(full) - 1 == timetable.entries.count(), "Every entry should be exported"
+    
+    sliced = rows(api_request(export_csv, 'get', path, {'teachers': str(lecture.teacher_id)}, pk=timetable.id))
+    expected = timetable.entries.filter(teacher_id=lecture.teacher_id).count() + timetable.entries.filter(is_break=True).count()
+    assert len(sliced) - 1 == expected, "Teacher slice should keep that teacher's lectures and the breaks"
+    assert {row[4] for row in sliced[1:] if row[6] == 'Class'} == {lecture.teacher.name}, "Slice should only list that teacher"
+    
+    response = api_request(export_csv, 'get', path, {'teachers': 'x'}, pk=timetable.id)
+    assert response.status_code == 400, "Bad teacher ids should be rejected"
+    
+    other = Timetable.objects.exclude(pk=timetable.pk).filter(entries__isnull=False).distinct().first()
+    export_many = TimetableViewSet.as_view({'get': 'export_many'})
+    combined = rows(api_request(export_many, 'get', '/api/timetables/export/', {'timetables': f'{timetable.id},{other.id}'}))
+    assert combined[0][0] == 'Timetable', "Multi-timetable export should name the timetable"
+    assert len(combined) - 1 == timetable.entries.count() + other.entries.count(), "Both timetables should be exported"
+    
+    print("✓ CSV exports stream complete and sliced timetables")
+    return True
+
+def test_data_export_formats():
+    """Test that the full export writes every row as JSON, NDJSON and gzip"""
+    print("\n=== Testing Data Export Formats ===")
+    
+    import gzip
+    import json
+    from api.exporters import DATA_TABLES, data_export_response
+    
+    def body(**options):
+        response = data_export_response(**options)
+        return response, b''.join(response.streaming_content)
+    
+    expected = {name: model.objects.count() for name, model in DATA_TABLES}
+    
+    _, document = body()
+    document = json.loads(document)
+    assert {name: len(rows) for name, rows in document.items()} == expected, "JSON export should hold every row"
+    
+    response, ndjson = body(ndjson=True)
+    assert response['Content-Type'] == 'application/x-ndjson'
+    counts = dict.fromkeys(expected, 0)
+    for line in ndjson.decode().splitlines():
+        counts[json.loads(line)['model']] += 1
+    assert counts == expected, "NDJSON export should hold every row"
+    
+    response, compressed = body(ndjson=True, compress=True)
+    assert response['Content-Type'] == 'application/gzip'
+    assert response['Content-Disposition'].endswith('.ndjson.gz"')
+    assert gzip.decompress(compressed) == ndjson, "Gzipped export should decompress to the plain one"
+    
+    print("✓ Full exports are complete in every format")
+    return True
+
+def test_repair_after_edit():
+    """Test that repair replaces only the entries an edit invalidated"""
+    print("\n=== Testing Timetable Repair ===")
+    
+    from api.models import DataCounter
+    from api.repair import TimetableRepairer
+    from api.statistics import entries_key, inputs_changed
+    from api.timetable_generator import InputsChanged
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    timetable = TimetableGenerator(seed=3).generate_timetable("Repair Test")
+    lecture = timetable.entries.filter(is_break=False).select_related('teacher', 'subject').first()
+    teacher, subject = lecture.teacher, lecture.subject
+    invalid = set(timetable.entries.filter(teacher=teacher, subject=subject).values_list('id', flat=True))
+    invalid_slots = set(timetable.entries.filter(id__in=invalid).values_list('time_slot_id', flat=True))
+    valid = set(timetable.entries.values_list('id', flat=True)) - invalid
+    
+    teacher.subjects.remove(subject)
+    try:
+        # A repair planned against inputs that change before it commits writes nothing
+        racing = TimetableRepairer(seed=3, attempts=2)
+        plan = racing.plan
+        
+        def plan_during_edit(*args):
+            inputs_changed()
+            return plan(*args)
+        
+        racing.plan = plan_during_edit
+        try:
+            racing.repair(timetable)
+            assert False, "A repair racing input edits should give up"
+        except InputsChanged:
+            pass
+        assert invalid <= set(timetable.entries.values_list('id', flat=True)), "A repair that gave up should write nothing"
+        
+        stats = TimetableRepairer(seed=3).repair(timetable)
+        assert stats['entries_removed'] == len(invalid), f"Only the unlinked lectures should be removed: {stats}"
+        assert stats['slots_resolved'] == len(invalid_slots), f"Only the slots that lost lectures should be re-solved: {stats}"
+        
+        remaining = set(timetable.entries.values_list('id', flat=True))
+        assert valid <= remaining, "Entries that still hold should be left untouched"
+        assert not remaining & invalid, "Invalidated entries should be gone"
+        assert not timetable.entries.filter(teacher=teacher, subject=subject).exists(), "Repair should not reschedule the unlinked pair"
+        counter = DataCounter.objects.get(key=entries_key(timetable.pk)).value
+        assert counter == len(remaining), "Entry counter should follow the repair"
+        
+        stats = TimetableRepairer(seed=3).repair(timetable)
+        assert stats['entries_removed'] == 0 and stats['entries_added'] == 0, f"A second repair should change nothing: {stats}"
+    finally:
+        teacher.subjects.add(subject)
+    
+    print("✓ Repair re-solves only invalidated entries")
+    return True
+
+def test_entry_delete_counters():
+    """Test that entry deletes keep the maintained counts and timetable deletes stay fast"""
+    print("\n=== Testing Entry Delete Counters ===")
+    
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from api.active import activate_timetable, active_timetable_id
+    from api.models import DataCounter
+    from api.statistics import entries_key
+    
+    def counted(key):
+        return DataCounter.objects.filter(key=key).values_list('value', flat=True).first() or 0
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    previous = Timetable.objects.get(pk=active_timetable_id())
+    timetable = TimetableGenerator(seed=5).generate_timetable("Delete Counter Test")
+    entries = list(timetable.entries.order_by('id'))
+    assert len(entries) >= 2, "Expected a few entries to delete"
+    entries[0].delete()
+    TimetableEntry.objects.filter(pk=entries[1].pk).delete()
+    assert counted(entries_key(timetable.pk)) == timetable.entries.count(), "Timetable entry count should follow deletes"
+    assert counted('timetable_entries') == TimetableEntry.objects.count(), "Total entry count should follow deletes"
+    
+    # Cascaded entries are subtracted by the timetable, without loading them
+    activate_timetable(previous)
+    with CaptureQueriesContext(connection) as queries:
+        timetable.delete()
+    loads = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and 'api_timetableentry' in query['sql']]
+    assert not loads, f"Deleting a timetable should fast-delete its entries: {loads}"
+    assert counted('timetable_entries') == TimetableEntry.objects.count(), "Total entry count should follow cascades"
+    
+    print("✓ Entry deletes keep the counters right")
+    return True
+
+def test_entry_cursor_pages():
+    """Test that entry pages follow keyset cursors without counting or repeating rows"""
+    print("\n=== Testing Entry Cursor Pages ===")
+    
+    import json
+    from urllib.parse import parse_qs, urlparse
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.db.models import Count
+    from django.test.utils import CaptureQueriesContext
+    from api.views import TimetableEntryViewSet
+    
+    # Reuses the timetables generated by the earlier tests
+    timetable = Timetable.objects.annotate(size=Count('entries')).order_by('-size').first()
+    expected = list(timetable.entries.order_by('id').values_list('id', flat=True))
+    assert len(expected) > 2, "Expected several pages of entries"
+    view = TimetableEntryViewSet.as_view({'get': 'list'})
+    user = User.objects.get_or_create(username='test-fixes')[0]
+    
+    params, seen = {'timetable': str(timetable.id), 'page_size': '2', 'fields': 'id'}, []
+    with CaptureQueriesContext(connection) as queries:
+        while params:
+            response = api_request(view, 'get', '/api/timetable-entries/', params, user=user)
+            assert response.status_code == 200, response.data
+            seen.extend(entry['id'] for entry in response.data['results'])
+            next_url = response.data['next']
+            params = {key: values[0] for key, values in parse_qs(urlparse(next_url).query).items()} if next_url else None
+    assert seen == expected, "Pages should list every entry once, in id order"
+    assert not any('COUNT(' in query['sql'] for query in queries.captured_queries), "Cursor pages should not count rows"
+    
+    response = api_request(view, 'get', '/api/timetable-entries/', {'timetable': str(timetable.id), 'stream': 'ndjson'}, user=user)
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)['id'] for line in lines] == expected, "NDJSON stream should hold every filtered entry"
+    
+    print("✓ Entry pages follow keyset cursors")
+    return True
+
+def test_entry_filters():
+    """Test that entry filters narrow the list and reject bad parameters"""
+    print("\n=== Testing Entry Filters ===")
+    
+    from api.views import TimetableEntryViewSet
+    
+    view = TimetableEntryViewSet.as_view({'get': 'list'})
+    lecture = TimetableEntry.objects.filter(is_break=False).select_related('time_slot').first()
+    params = {
+        'timetable': str(lecture.timetable_id),
+        'teacher': str(lecture.teacher_id),
+        'day': lecture.day.lower(),
+        'from': lecture.time_slot.start_time.strftime('%H:%M'),
+        'page_size': '1000',
+    }
+    response = api_request(view, 'get', '/api/timetable-entries/', params)
+    assert response.status_code == 200, response.data
+    expected = TimetableEntry.objects.filter(
+        timetable_id=lecture.timetable_id, teacher_id=lecture.teacher_id, day=lecture.day,
+        time_slot__start_time__gte=lecture.time_slot.start_time
+    )
+    assert sorted(entry['id'] for entry in response.data['results']) == sorted(expected.values_list('id', flat=True))
+    
+    active = Timetable.objects.get(is_active=True)
+    response = api_request(view, 'get', '/api/timetable-entries/', {'timetable': 'active', 'page_size': '1000'})
+    assert {entry['timetable'] for entry in response.data['results']} == {active.id}, "?timetable=active should list the active timetable"
+    
+    for bad in ({'day': 'Someday'}, {'teacher': 'abc'}, {'from': '9 o\'clock'}, {'classroom': '1,x'}):
+        response = api_request(view, 'get', '/api/timetable-entries/', bad)
+        assert response.status_code == 400, f"{bad} should be rejected"
+        assert 'error' in response.data, "Filter errors should be reported as {'error': ...}"
+    
+    print("✓ Entry filters narrow the list and validate their input")
+    return True
+
+def test_single_flight_generation():
+    """Test that identical concurrent generation requests share one solve"""
+    print("\n=== Testing Single-Flight Generation ===")
+    
+    import threading
+    import time
+    from django.db import connection
+    from api.coordinator import GenerationCoordinator
+    
+    coordinator = GenerationCoordinator(max_concurrent=2)
+    options = {'engine': 'greedy'}
+    release = threading.Event()
+    results = []
+    
+    def hold(done, total):
+        # Keep the leader's solve in flight until the other requests are waiting on it
+        release.wait(10)
+    
+    def request(progress=None):
+        try:
+            results.append(coordinator.generate("Single Flight", options, progress=progress))
+        finally:
+            connection.close()
+    
+    # Reuses the subjects, teacher, classrooms and slots from test_timetable_generator
+    before = Timetable.objects.count()
+    leader = threading.Thread(target=request, args=(hold,))
+    leader.start()
+    while not coordinator.flights:
+        time.sleep(0.01)
+    waiters = [threading.Thread(target=request) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in [leader] + waiters:
+        thread.join(30)
+    
+    assert len(results) == 4, "Every request should get a timetable"
+    assert len({timetable.id for timetable, _ in results}) == 1, "Requests should share one timetable"
+    assert sorted(stats['shared'] for _, stats in results) == [False, True, True, True], "Only one request should solve"
+    assert Timetable.objects.count() == before + 1, "Only one timetable should be written"
+    assert not coordinator.flights, "The finished flight should be cleared"
+    
+    print("✓ Identical concurrent requests share one solve")
+    return True
+
 def test_serializer_validation():
     """Test serializer validation handles break entries correctly"""
     print("\n=== Testing Serializer Validation ===")
@@ -306,6 +932,23 @@ def main():
         test_migration_applied,
         test_model_null_fks,
         test_timetable_generator,
+        test_csp_engine,
+        test_slot_matching,
+        test_read_cache_version,
+        test_metrics_registry,
+        test_activate_timetable_api,
+        test_seeded_generation_memo,
+        test_sparse_entry_queries,
+        test_generation_job_progress,
+        test_import_round_trip,
+        test_all_data_summaries,
+        test_csv_export,
+        test_data_export_formats,
+        test_repair_after_edit,
+        test_entry_delete_counters,
+        test_entry_cursor_pages,
+        test_entry_filters,
+        test_single_flight_generation,
         test_serializer_validation,
         test_api_endpoints,
     ]